@@ -46,6 +46,8 @@ def main():
     search_parser.add_argument("--index", default="vector_stores", help="Index directory")
     search_parser.add_argument("--results", type=int, default=5, help="Number of results to return")
     search_parser.add_argument("--type", choices=["basic", "langchain"], default="basic", help="Search type")
+    search_parser.add_argument("--compress", action="store_true", help="Compress basic search results to the passages relevant to the query")
+    search_parser.add_argument("--keyword-filter", action="store_true", help="Only search documents that share keywords with the query")
     
     # Chat command
     chat_parser = subparsers.add_parser("chat", help="Chat with LangChain")
@@ -80,7 +82,8 @@ def main():
     elif args.command == "search":
         if args.type == "basic":
             search_engine = LegalSearchEngine(args.index)
-            results = search_engine.search(args.query, k=args.results)
+            results = search_engine.search(args.query, k=args.results, compress=args.compress,
+                                           keyword_filter=args.keyword_filter)
             for i, result in enumerate(results):
                 print(f"\nResult {i+1}:")
                 print(f"Source: {result['source']}")
@@ -4,12 +4,16 @@ Crawler module for the legal search agent.
 
 import os
 import re
+import copy
 import time
 import hashlib
 import json
 import logging
 import requests
-from typing import Dict, List, Set, Tuple, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Any, Deque, Dict, List, Set, Tuple, Optional
 from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
@@ -32,6 +36,7 @@ class LegalCrawler:
     RETRY_DELAY = 5  # seconds
     UNSAFE_EXTENSIONS = {'exe', 'dll', 'bat', 'sh', 'command', 'js', 'jsp', 'php', 'asp', 'aspx'}
     MIN_REQUEST_DELAY = 0.5  # minimum delay between requests in seconds
+    MAX_CONCURRENT_SOURCES = 4  # sources (sites) crawled at the same time
     
     def __init__(self, config: Config):
         """
@@ -60,9 +65,13 @@ class LegalCrawler:
             ]
             
             self.visited_urls: Set[str] = set()
-            self.urls_to_visit: List[Tuple[str, int]] = []  # (url, depth)
+            self.urls_to_visit: Deque[Tuple[str, int]] = deque()  # (url, depth)
             self.document_count = 0
             
+            # Keep-alive connections for requests to the same site; each
+            # source worker opens its own session in _crawl_source
+            self.session: Optional[requests.Session] = None
+            
             # Validate configuration
             self._validate_crawler_config()
             
@@ -128,62 +137,98 @@ class LegalCrawler:
             
             sources = self.config.get_sources()
             
-            for source in sources:
-                source_name = source.get('name', 'unknown')
-                source_url = source.get('url')
-                source_selectors = source.get('selectors', {})
-                
-                # Create a safe directory name
-                safe_source_name = re.sub(r'[^\w\-]', '_', source_name)
-                source_output_dir = os.path.join(output_dir, safe_source_name)
-                
-                if not os.path.exists(source_output_dir):
-                    try:
-                        os.makedirs(source_output_dir)
-                    except OSError as e:
-                        logger.error(f"Failed to create source directory {source_output_dir}: {str(e)}")
-                        continue
-                
-                logger.info(f"Crawling source: {source_name} ({source_url})")
-                
-                # Reset for each source
-                self.visited_urls = set()
-                self.urls_to_visit = [(source_url, 0)]
-                self.document_count = 0
-                
-                with tqdm(total=self.max_pages, desc=f"Crawling {source_name}") as pbar:
-                    while self.urls_to_visit and self.document_count < self.max_pages:
-                        url, depth = self.urls_to_visit.pop(0)
-                        
-                        if url in self.visited_urls:
-                            continue
-                        
-                        # Use safe execution pattern
-                        success = safe_execute(
-                            func=self._process_url_safely,
-                            error_message=f"Error processing URL {url}",
-                            logger=logger,
-                            default_return=False,
-                            error_class=CrawlerError,
-                            url=url,
-                            depth=depth,
-                            selectors=source_selectors,
-                            output_dir=source_output_dir
-                        )
-                        
-                        if success:
-                            self.visited_urls.add(url)
-                            pbar.update(1)
-                        
-                        # Add delay between requests
-                        time.sleep(self.request_delay)
-                
-                logger.info(f"Completed crawling source: {source_name}, downloaded {self.document_count} documents")
+            # Each source is a different site, so sources are crawled concurrently
+            # while requests to any one site stay sequential and rate limited
+            with ThreadPoolExecutor(max_workers=min(len(sources), self.MAX_CONCURRENT_SOURCES)) as executor:
+                document_counts = list(executor.map(
+                    self._crawl_source, sources, repeat(output_dir), range(len(sources))
+                ))
+            
+            self.document_count = sum(document_counts)
         
         except Exception as e:
             logger.error(f"Crawling failed: {str(e)}")
             raise CrawlerError(f"Crawling failed: {str(e)}")
     
+    def _crawl_source(self, source: Dict[str, Any], output_dir: str, position: int = 0) -> int:
+        """
+        Crawl a single source.
+        
+        The source is crawled by a copy of the crawler with its own URL queue,
+        visited set and HTTP session, so several sources can be crawled at once.
+        
+        Args:
+            source: Source configuration
+            output_dir: Directory to save downloaded documents
+            position: Position of the source's progress bar
+            
+        Returns:
+            Number of documents downloaded from the source
+        """
+        source_name = source.get('name', 'unknown')
+        source_url = source.get('url')
+        source_selectors = source.get('selectors', {})
+        
+        # Create a safe directory name
+        safe_source_name = re.sub(r'[^\w\-]', '_', source_name)
+        source_output_dir = os.path.join(output_dir, safe_source_name)
+        
+        if not os.path.exists(source_output_dir):
+            try:
+                os.makedirs(source_output_dir)
+            except OSError as e:
+                logger.error(f"Failed to create source directory {source_output_dir}: {str(e)}")
+                return 0
+        
+        logger.info(f"Crawling source: {source_name} ({source_url})")
+        
+        # Fresh state for each source
+        worker = copy.copy(self)
+        worker.visited_urls = set()
+        worker.urls_to_visit = deque([(source_url, 0)])
+        worker.document_count = 0
+        worker.session = None
+        
+        next_request_time = time.monotonic()
+        
+        try:
+            with tqdm(total=self.max_pages, desc=f"Crawling {source_name}", position=position) as pbar:
+                while worker.urls_to_visit and worker.document_count < self.max_pages:
+                    url, depth = worker.urls_to_visit.popleft()
+                    
+                    if url in worker.visited_urls:
+                        continue
+                    
+                    # Keep at least request_delay between requests; time spent
+                    # parsing and saving the previous page counts towards it
+                    time.sleep(max(0.0, next_request_time - time.monotonic()))
+                    next_request_time = time.monotonic() + self.request_delay
+                    
+                    # Use safe execution pattern
+                    success = safe_execute(
+                        func=worker._process_url_safely,
+                        error_message=f"Error processing URL {url}",
+                        logger=logger,
+                        default_return=False,
+                        error_class=CrawlerError,
+                        url=url,
+                        depth=depth,
+                        selectors=source_selectors,
+                        output_dir=source_output_dir
+                    )
+                    
+                    if success:
+                        worker.visited_urls.add(url)
+                        pbar.update(1)
+        finally:
+            # The session is created on the worker's first request
+            if worker.session is not None:
+                worker.session.close()
+        
+        logger.info(f"Completed crawling source: {source_name}, downloaded {worker.document_count} documents")
+        
+        return worker.document_count
+    
     def _process_url_safely(self, url: str, depth: int, selectors: Dict, output_dir: str) -> bool:
         """
         Process a URL safely with retries and error handling.
@@ -238,7 +283,11 @@ class LegalCrawler:
         
         # Download content with proper error handling
         try:
-            response = requests.get(
+            http = self.session
+            if http is None:
+                # Requests to the same site reuse one session, created on first use
+                http = self.session = requests.Session()
+            response = http.get(
                 url,
                 headers=self.headers,
                 timeout=self.REQUEST_TIMEOUT,
@@ -308,7 +357,6 @@ class LegalCrawler:
         # Check for unsafe paths or query parameters
         unsafe_patterns = [
             r'\.\./',  # Directory traversal
-            r'^\/',    # Absolute paths
             r'^~/',    # Home directory
             r';\s*',   # Command injection
             r'<\s*script'  # XSS attempts
@@ -6,10 +6,13 @@ crawling, and data extraction capabilities into our legal search agent.
 """
 
 import os
+import copy
 import json
 import time
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+import threading
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Any, Mapping, Optional, Union, Tuple
 from urllib.parse import urlparse
 
 # Import error handlers
@@ -31,15 +34,34 @@ except ImportError:
     FirecrawlAPIError = Exception
     FirecrawlTimeoutError = Exception
 
+
+def _safe_len(data: Any) -> int:
+    """
+    Get the length of a response payload without consuming it.
+    
+    Args:
+        data: Response payload (list or iterator)
+        
+    Returns:
+        Number of items, or -1 if the payload has no cheap length
+    """
+    return len(data) if hasattr(data, "__len__") else -1
+
+
 class FirecrawlClient:
     """Client for interacting with the Firecrawl API."""
     
+    # Instance attributes (avoids a per-instance __dict__)
+    __slots__ = ("api_key", "client")
+    
     # Constants
     MAX_URL_LIMIT = 100  # Maximum URLs to extract in one batch
     MAX_BATCH_SIZE = 20  # Maximum URLs to process in one batch
     DEFAULT_TIMEOUT = 600  # Default timeout for API calls (10 minutes)
     MAX_RETRIES = 3  # Maximum number of retries for API calls
     RETRY_DELAY = 5  # Delay between retries in seconds
+    CRAWL_POLL_INTERVALS = (1, 5, 15)  # Growing delays between crawl status polls (seconds)
+    CRAWL_FAILED_STATUSES = ('failed', 'cancelled')  # Crawl job states that end without completing
     
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -152,7 +174,7 @@ class FirecrawlClient:
     def scrape_url(self, 
                   url: str, 
                   formats: List[str] = ["markdown", "html"], 
-                  json_schema: Optional[Dict[str, Any]] = None,
+                  json_schema: Optional[Mapping[str, Any]] = None,
                   timeout: int = None) -> Dict[str, Any]:
         """
         Scrape a URL using Firecrawl.
@@ -185,7 +207,7 @@ class FirecrawlClient:
         try:
             # Make the API call with retries
             if json_schema and "json" in formats:
-                json_config = JsonConfig(schema=json_schema)
+                json_config = JsonConfig(schema=copy.deepcopy(dict(json_schema)))
                 response = self._retry_api_call(
                     self.client.scrape_url,
                     url,
@@ -211,20 +233,18 @@ class FirecrawlClient:
             logger.error(f"Error scraping URL {url}: {str(e)}")
             raise APIError(f"Error scraping URL: {str(e)}")
     
-    def crawl_url(
-        self, 
-        url: str, 
-        limit: int = 100, 
-        max_depth: int = 3,
-        formats: List[str] = ["markdown"],
-        excludes: List[str] = [], 
-        includes: List[str] = [],
-        wait_for_completion: bool = True,
-        timeout: int = None,
-        json_schema: Optional[Dict[str, Any]] = None
+    def _build_crawl_params(
+        self,
+        url: str,
+        limit: int,
+        max_depth: int,
+        formats: List[str],
+        excludes: List[str],
+        includes: List[str],
+        json_schema: Optional[Mapping[str, Any]]
     ) -> Dict[str, Any]:
         """
-        Crawl a URL and its subpages using Firecrawl.
+        Validate crawl arguments and build the crawl request parameters.
         
         Args:
             url: URL to crawl
@@ -233,16 +253,13 @@ class FirecrawlClient:
             formats: List of output formats to request
             excludes: List of URL patterns to exclude
             includes: List of URL patterns to include
-            wait_for_completion: Whether to wait for the crawl to complete
-            timeout: Maximum time to wait for completion (seconds)
             json_schema: Optional schema for structured data extraction
             
         Returns:
-            Crawled data
+            Crawl parameters for the Firecrawl API
             
         Raises:
-            ValidationError: If URL is invalid or parameters are invalid
-            APIError: If there's an error in the API call
+            ValidationError: If URL is invalid
         """
         # Validate URL
         if not self._validate_url(url):
@@ -259,52 +276,174 @@ class FirecrawlClient:
         if not formats:
             formats = ["markdown"]  # Default to markdown if no valid formats
         
-        # Set up timeout
-        timeout = timeout or self.DEFAULT_TIMEOUT
-        
         logger.info(f"Crawling URL: {url} (limit: {limit}, depth: {max_depth}, formats: {formats})")
         
-        try:
-            # Construct crawl parameters
-            crawl_params = {
-                "limit": limit,
-                "maxDepth": max_depth,
-                "crawlerOptions": {
-                    "excludes": excludes,
-                    "includes": includes
-                },
-                "scrapeOptions": {
-                    "formats": formats
-                }
+        # Construct crawl parameters
+        crawl_params = {
+            "limit": limit,
+            "maxDepth": max_depth,
+            "crawlerOptions": {
+                "excludes": excludes,
+                "includes": includes
+            },
+            "scrapeOptions": {
+                "formats": formats
             }
+        }
+        
+        # Add JSON schema if provided
+        if json_schema and "json" in formats:
+            crawl_params["scrapeOptions"]["jsonOptions"] = {"schema": copy.deepcopy(dict(json_schema))}
+        
+        return crawl_params
+    
+    def crawl_url(
+        self, 
+        url: str, 
+        limit: int = 100, 
+        max_depth: int = 3,
+        formats: List[str] = ["markdown"],
+        excludes: List[str] = [], 
+        includes: List[str] = [],
+        wait_for_completion: bool = True,
+        timeout: int = None,
+        json_schema: Optional[Mapping[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Crawl a URL and its subpages using Firecrawl.
+        
+        With wait_for_completion every crawled page is held in the returned
+        response; use crawl_url_iter for large crawls.
+        
+        Args:
+            url: URL to crawl
+            limit: Maximum number of pages to crawl
+            max_depth: Maximum crawl depth
+            formats: List of output formats to request
+            excludes: List of URL patterns to exclude
+            includes: List of URL patterns to include
+            wait_for_completion: Whether to wait for the crawl to complete
+            timeout: Maximum time to wait for completion (seconds)
+            json_schema: Optional schema for structured data extraction
             
-            # Add JSON schema if provided
-            if json_schema and "json" in formats:
-                crawl_params["scrapeOptions"]["jsonOptions"] = {"schema": json_schema}
+        Returns:
+            Crawled data, or the crawl job if not waiting for completion
             
+        Raises:
+            ValidationError: If URL is invalid or parameters are invalid
+            APIError: If there's an error in the API call, the job fails or times out
+        """
+        if not wait_for_completion:
+            crawl_params = self._build_crawl_params(url, limit, max_depth, formats, excludes, includes, json_schema)
+            return self._start_crawl(url, crawl_params, timeout or self.DEFAULT_TIMEOUT)
+        
+        pages = list(self.crawl_url_iter(url, limit, max_depth, formats, excludes, includes, timeout, json_schema))
+        return {"success": True, "status": "completed", "data": pages}
+    
+    def _start_crawl(self, url: str, crawl_params: Dict[str, Any], timeout: int) -> Dict[str, Any]:
+        """
+        Submit a crawl job without waiting for it to finish.
+        
+        Args:
+            url: URL to crawl
+            crawl_params: Crawl parameters for the Firecrawl API
+            timeout: Timeout for the API call (seconds)
+            
+        Returns:
+            Crawl job, including its ID
+            
+        Raises:
+            APIError: If there's an error in the API call
+        """
+        try:
             # Submit the crawl job with retries
             response = self._retry_api_call(
                 self.client.crawl_url,
-                url, 
-                params=crawl_params, 
-                wait_until_done=wait_for_completion,
+                url,
+                params=crawl_params,
+                wait_until_done=False,
                 timeout=timeout
             )
-            
-            if wait_for_completion:
-                data_count = len(response.get('data', []))
-                logger.info(f"Completed crawl of {url}, found {data_count} pages")
-            else:
-                logger.info(f"Started crawl of {url}, job ID: {response.get('id')}")
-            
-            return response
-        
         except APIError:
             # Re-raise APIError
             raise
         except Exception as e:
             logger.error(f"Error crawling URL {url}: {str(e)}")
             raise APIError(f"Error crawling URL: {str(e)}")
+        
+        logger.info(f"Started crawl of {url}, job ID: {response.get('id')}")
+        return response
+    
+    def crawl_url_iter(
+        self,
+        url: str,
+        limit: int = 100,
+        max_depth: int = 3,
+        formats: List[str] = ["markdown"],
+        excludes: List[str] = [],
+        includes: List[str] = [],
+        timeout: int = None,
+        json_schema: Optional[Mapping[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Crawl a URL and yield pages as the crawl job produces them.
+        
+        Unlike crawl_url, pages are not buffered until the job completes, so
+        callers can process and discard each page to keep memory bounded.
+        
+        Args:
+            url: URL to crawl
+            limit: Maximum number of pages to crawl
+            max_depth: Maximum crawl depth
+            formats: List of output formats to request
+            excludes: List of URL patterns to exclude
+            includes: List of URL patterns to include
+            timeout: Maximum time to wait for completion (seconds)
+            json_schema: Optional schema for structured data extraction
+            
+        Yields:
+            Crawled page data
+            
+        Raises:
+            ValidationError: If URL is invalid or parameters are invalid
+            APIError: If there's an error in the API call, the job fails, is
+                cancelled or times out
+        """
+        crawl_params = self._build_crawl_params(url, limit, max_depth, formats, excludes, includes, json_schema)
+        
+        # Set up timeout
+        timeout = timeout or self.DEFAULT_TIMEOUT
+        
+        job_id = self._start_crawl(url, crawl_params, timeout).get('id')
+        
+        deadline = time.monotonic() + timeout
+        poll = 0
+        seen = 0
+        
+        while True:
+            status = self.check_crawl_status(job_id)
+            data = status.get('data') or []
+            
+            # Yield only the pages that arrived since the last poll
+            for page in data[seen:]:
+                yield page
+            seen = max(seen, len(data))
+            
+            state = status.get('status')
+            if state == 'completed':
+                logger.info(f"Completed crawl of {url}, found {seen} pages")
+                return
+            if state in self.CRAWL_FAILED_STATUSES:
+                logger.error(f"Crawl job {job_id} {state} after {seen} pages")
+                raise APIError(f"Crawl job {job_id} {state}")
+            
+            if time.monotonic() >= deadline:
+                logger.error(f"Crawl job {job_id} did not complete within {timeout} seconds")
+                raise APIError(f"Crawl job {job_id} timed out after {timeout} seconds")
+            
+            # Back off gradually while the job is still running
+            time.sleep(self.CRAWL_POLL_INTERVALS[min(poll, len(self.CRAWL_POLL_INTERVALS) - 1)])
+            poll += 1
     
     def check_crawl_status(self, job_id: str) -> Dict[str, Any]:
         """
@@ -452,8 +591,11 @@ class FirecrawlClient:
                 timeout=timeout or self.DEFAULT_TIMEOUT
             )
             
-            result_count = len(response.get('data', []))
-            logger.info(f"Searched for '{query}', found {result_count} results")
+            result_count = _safe_len(response.get('data', []))
+            if result_count >= 0:
+                logger.info(f"Searched for '{query}', found {result_count} results")
+            else:
+                logger.info(f"Searched for '{query}'; result count unknown until the streamed data is read")
             return response
         
         except APIError:
@@ -466,7 +608,7 @@ class FirecrawlClient:
     def extract_structured_data(
         self, 
         urls: Union[str, List[str]], 
-        schema: Optional[Dict[str, Any]] = None,
+        schema: Optional[Mapping[str, Any]] = None,
         prompt: Optional[str] = None,
         timeout: int = None
     ) -> Dict[str, Any]:
@@ -518,7 +660,7 @@ class FirecrawlClient:
             response = self._retry_api_call(
                 self.client.extract,
                 valid_urls,
-                schema=schema,
+                schema=copy.deepcopy(dict(schema)) if schema else None,
                 prompt=prompt,
                 timeout=timeout or self.DEFAULT_TIMEOUT
             )
@@ -597,204 +739,246 @@ class FirecrawlClient:
         return results
 
 
+# Shared clients for the whole process, one per API key
+_CLIENTS: Dict[Optional[str], FirecrawlClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_default_client(api_key: Optional[str] = None) -> FirecrawlClient:
+    """
+    Get the process-wide Firecrawl client for an API key.
+    
+    The client is created on first use and shared by all callers with the
+    same key afterwards. Prefer this over creating a FirecrawlClient directly.
+    
+    Args:
+        api_key: Firecrawl API key (optional, defaults to the FIRECRAWL_API_KEY env var)
+        
+    Returns:
+        Shared FirecrawlClient instance
+        
+    Raises:
+        ImportError: If Firecrawl SDK is not installed
+        APIError: If the client cannot be initialized
+    """
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(api_key)
+            if client is None:
+                client = _CLIENTS[api_key] = FirecrawlClient(api_key=api_key)
+    
+    return client
+
+
 # Legal document schemas
+# Built once at import time and shared read-only. MappingProxyType guards the
+# top level only, so nested values must not be modified either; the client
+# deep-copies a schema where it hands it to the SDK.
+_BUSINESS_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "entity_name": {
+            "type": "string",
+            "description": "Legal name of the business entity"
+        },
+        "entity_type": {
+            "type": "string",
+            "description": "Type of entity (LLC, Corporation, etc.)"
+        },
+        "filing_number": {
+            "type": "string",
+            "description": "State filing or registration number"
+        },
+        "status": {
+            "type": "string",
+            "description": "Current status (Active, Dissolved, etc.)"
+        },
+        "formation_date": {
+            "type": "string",
+            "description": "Date the entity was formed"
+        },
+        "jurisdiction": {
+            "type": "string",
+            "description": "State or jurisdiction of formation"
+        },
+        "registered_agent": {
+            "type": "object",
+            "properties": {
+                "name": { "type": "string" },
+                "address": { "type": "string" }
+            }
+        },
+        "principals": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": { "type": "string" },
+                    "title": { "type": "string" }
+                }
+            }
+        },
+        "annual_report_due": {
+            "type": "string",
+            "description": "Next annual report due date"
+        },
+        "good_standing": {
+            "type": "boolean",
+            "description": "Whether the entity is in good standing"
+        }
+    },
+    "required": ["entity_name", "entity_type", "filing_number", "status"]
+})
+
+_COURT_CASE_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "case_number": {
+            "type": "string",
+            "description": "The official case identifier"
+        },
+        "court": {
+            "type": "string",
+            "description": "Court where the case was filed"
+        },
+        "filing_date": {
+            "type": "string",
+            "description": "Date when the case was filed"
+        },
+        "parties": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": { "type": "string" },
+                    "role": { "type": "string" }
+                }
+            }
+        },
+        "judges": {
+            "type": "array",
+            "items": { "type": "string" }
+        },
+        "status": {
+            "type": "string",
+            "description": "Current status of the case"
+        },
+        "disposition": {
+            "type": "string",
+            "description": "Final judgment or disposition"
+        },
+        "docket_entries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "date": { "type": "string" },
+                    "description": { "type": "string" }
+                }
+            }
+        },
+        "nature_of_suit": {
+            "type": "string",
+            "description": "Category or nature of the lawsuit"
+        }
+    },
+    "required": ["case_number", "court", "filing_date", "parties"]
+})
+
+_JUDGMENT_SCHEMA = MappingProxyType({
+    "type": "object",
+    "properties": {
+        "case_number": {
+            "type": "string",
+            "description": "The case identifier"
+        },
+        "judgment_date": {
+            "type": "string",
+            "description": "Date when the judgment was entered"
+        },
+        "judgment_type": {
+            "type": "string",
+            "description": "Type of judgment (Default, Summary, etc.)"
+        },
+        "plaintiff": {
+            "type": "string",
+            "description": "Party awarded the judgment"
+        },
+        "defendant": {
+            "type": "string",
+            "description": "Party against whom judgment was entered"
+        },
+        "amount": {
+            "type": "string",
+            "description": "Monetary amount of the judgment"
+        },
+        "interest_rate": {
+            "type": "string",
+            "description": "Interest rate on the judgment"
+        },
+        "status": {
+            "type": "string",
+            "description": "Current status (Satisfied, Outstanding, etc.)"
+        },
+        "filing_location": {
+            "type": "string",
+            "description": "Where the judgment was filed/recorded"
+        },
+        "satisfaction_date": {
+            "type": "string",
+            "description": "Date when the judgment was satisfied, if applicable"
+        },
+        "enforcement_actions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "date": { "type": "string" },
+                    "action": { "type": "string" }
+                }
+            }
+        }
+    },
+    "required": ["case_number", "judgment_date", "plaintiff", "defendant", "amount"]
+})
+
+
 class LegalSchemas:
     """Collection of JSON schemas for legal document types."""
     
     @staticmethod
-    def business_registration_schema() -> Dict[str, Any]:
+    def business_registration_schema() -> Mapping[str, Any]:
         """
         Get the schema for business registration data.
         
         Returns:
-            JSON schema
+            Read-only JSON schema
         """
-        return {
-            "type": "object",
-            "properties": {
-                "entity_name": {
-                    "type": "string",
-                    "description": "Legal name of the business entity"
-                },
-                "entity_type": {
-                    "type": "string",
-                    "description": "Type of entity (LLC, Corporation, etc.)"
-                },
-                "filing_number": {
-                    "type": "string",
-                    "description": "State filing or registration number"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Current status (Active, Dissolved, etc.)"
-                },
-                "formation_date": {
-                    "type": "string",
-                    "description": "Date the entity was formed"
-                },
-                "jurisdiction": {
-                    "type": "string",
-                    "description": "State or jurisdiction of formation"
-                },
-                "registered_agent": {
-                    "type": "object",
-                    "properties": {
-                        "name": { "type": "string" },
-                        "address": { "type": "string" }
-                    }
-                },
-                "principals": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": { "type": "string" },
-                            "title": { "type": "string" }
-                        }
-                    }
-                },
-                "annual_report_due": {
-                    "type": "string",
-                    "description": "Next annual report due date"
-                },
-                "good_standing": {
-                    "type": "boolean",
-                    "description": "Whether the entity is in good standing"
-                }
-            },
-            "required": ["entity_name", "entity_type", "filing_number", "status"]
-        }
+        return _BUSINESS_SCHEMA
     
     @staticmethod
-    def court_case_schema() -> Dict[str, Any]:
+    def court_case_schema() -> Mapping[str, Any]:
         """
         Get the schema for court case data.
         
         Returns:
-            JSON schema
+            Read-only JSON schema
         """
-        return {
-            "type": "object",
-            "properties": {
-                "case_number": {
-                    "type": "string",
-                    "description": "The official case identifier"
-                },
-                "court": {
-                    "type": "string",
-                    "description": "Court where the case was filed"
-                },
-                "filing_date": {
-                    "type": "string",
-                    "description": "Date when the case was filed"
-                },
-                "parties": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "name": { "type": "string" },
-                            "role": { "type": "string" }
-                        }
-                    }
-                },
-                "judges": {
-                    "type": "array",
-                    "items": { "type": "string" }
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Current status of the case"
-                },
-                "disposition": {
-                    "type": "string",
-                    "description": "Final judgment or disposition"
-                },
-                "docket_entries": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "date": { "type": "string" },
-                            "description": { "type": "string" }
-                        }
-                    }
-                },
-                "nature_of_suit": {
-                    "type": "string",
-                    "description": "Category or nature of the lawsuit"
-                }
-            },
-            "required": ["case_number", "court", "filing_date", "parties"]
-        }
+        return _COURT_CASE_SCHEMA
     
     @staticmethod
-    def judgment_schema() -> Dict[str, Any]:
+    def judgment_schema() -> Mapping[str, Any]:
         """
         Get the schema for judgment data.
         
         Returns:
-            JSON schema
+            Read-only JSON schema
         """
-        return {
-            "type": "object",
-            "properties": {
-                "case_number": {
-                    "type": "string",
-                    "description": "The case identifier"
-                },
-                "judgment_date": {
-                    "type": "string",
-                    "description": "Date when the judgment was entered"
-                },
-                "judgment_type": {
-                    "type": "string",
-                    "description": "Type of judgment (Default, Summary, etc.)"
-                },
-                "plaintiff": {
-                    "type": "string",
-                    "description": "Party awarded the judgment"
-                },
-                "defendant": {
-                    "type": "string",
-                    "description": "Party against whom judgment was entered"
-                },
-                "amount": {
-                    "type": "string",
-                    "description": "Monetary amount of the judgment"
-                },
-                "interest_rate": {
-                    "type": "string",
-                    "description": "Interest rate on the judgment"
-                },
-                "status": {
-                    "type": "string",
-                    "description": "Current status (Satisfied, Outstanding, etc.)"
-                },
-                "filing_location": {
-                    "type": "string",
-                    "description": "Where the judgment was filed/recorded"
-                },
-                "satisfaction_date": {
-                    "type": "string",
-                    "description": "Date when the judgment was satisfied, if applicable"
-                },
-                "enforcement_actions": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "date": { "type": "string" },
-                            "action": { "type": "string" }
-                        }
-                    }
-                }
-            },
-            "required": ["case_number", "judgment_date", "plaintiff", "defendant", "amount"]
-        }
+        return _JUDGMENT_SCHEMA
     
     @staticmethod
-    def get_schema_for_url(url: str) -> Optional[Dict[str, Any]]:
+    def get_schema_for_url(url: str) -> Optional[Mapping[str, Any]]:
         """
         Get the appropriate schema for a URL based on pattern matching.
         
@@ -802,7 +986,7 @@ class LegalSchemas:
             url: URL to get schema for
             
         Returns:
-            JSON schema or None if no matching schema
+            Read-only JSON schema or None if no matching schema
         """
         if not url:
             return None
@@ -811,15 +995,15 @@ class LegalSchemas:
         
         # Check for business registration sites
         if any(term in url_lower for term in ["sos.", "secretary", "business", "corporation", "entity", "llc", "corp"]):
-            return LegalSchemas.business_registration_schema()
+            return _BUSINESS_SCHEMA
         
         # Check for court sites
         elif any(term in url_lower for term in ["court", "judiciary", "docket", "pacer", "justia", "caselaw", "opinion"]):
-            return LegalSchemas.court_case_schema()
+            return _COURT_CASE_SCHEMA
         
         # Check for judgment sites
         elif any(term in url_lower for term in ["judgment", "lien", "nyscef", "clerk", "records", "ucc"]):
-            return LegalSchemas.judgment_schema()
+            return _JUDGMENT_SCHEMA
         
         # No matching schema
         return None
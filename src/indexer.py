@@ -3,17 +3,26 @@ Document indexer module for the legal search agent.
 """
 
 import os
+import re
 import json
+import asyncio
+import random
+import hashlib
 import logging
-import pickle
-from typing import Dict, List, Any, Optional
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Any, Optional, Set, Tuple
 
 import chromadb
-from langchain.embeddings import OpenAIEmbeddings
+import numpy as np
+import openai
+import orjson
 from langchain.vectorstores import Chroma
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from tqdm import tqdm
 
+from src.openai_clients import get_embeddings
+from src.search import extract_keywords, open_keyword_index
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,17 +34,238 @@ logging.basicConfig(
 )
 logger = logging.getLogger('DocumentIndexer')
 
+# Chunking parameters
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+
+# Streaming limits for index_directory: documents submitted to the process
+# pool at a time, and pending chunks that trigger an embed-and-write
+STREAM_WINDOW_DOCUMENTS = 512
+STREAM_FLUSH_CHUNKS = 8192
+
+# Chunk ids checked against the vector store per lookup
+ID_LOOKUP_BATCH = 1000
+
+# Attempts per embedding batch when the API responds with 429
+EMBED_MAX_RETRIES = 5
+
+# Per-index record of document content hashes, used to skip unchanged files
+MANIFEST_FILENAME = 'manifest.json'
+
+# Chunk boundaries tried by _fast_split, from coarsest to finest
+SEPARATORS = ["\n\n", "\n", ". ", " "]
+
+# HNSW index settings applied when the collection is created. Chroma's HNSW
+# segment stores vectors as float32 only, so embeddings are not quantized.
+HNSW_COLLECTION_METADATA = {
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+    "hnsw:batch_size": 10000,
+    "hnsw:sync_threshold": 100000
+}
+
+# Regex matching every chunk boundary, and each boundary's preference rank
+_SPLIT_RE = re.compile('|'.join(re.escape(separator) for separator in SEPARATORS))
+_SEPARATOR_RANK = {separator: rank for rank, separator in enumerate(SEPARATORS)}
+
+# How documents are chunked, persisted alongside each index
+_SPLITTER_CONFIG = {
+    'splitter': '_fast_split',
+    'chunk_size': CHUNK_SIZE,
+    'chunk_overlap': CHUNK_OVERLAP,
+    'separators': SEPARATORS,
+    'boundary_pattern': _SPLIT_RE.pattern
+}
+
+
+def _iter_json(root: str) -> Iterator[str]:
+    """
+    Recursively yield the paths of JSON files under a directory.
+    
+    Args:
+        root: Directory to walk
+        
+    Yields:
+        Paths of JSON files
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_json(entry.path)
+            elif entry.name.endswith('.json'):
+                yield entry.path
+
+
+def _file_digest(path: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+    
+    Args:
+        path: Path to the file
+        
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_version(index_dir: str) -> int:
+    """
+    Get a stamp that changes every time index_directory finishes on an index.
+    
+    Args:
+        index_dir: Directory for the index
+        
+    Returns:
+        Modification time of the index manifest in nanoseconds, or 0 if the
+        index has no manifest
+    """
+    try:
+        return os.stat(os.path.join(index_dir, MANIFEST_FILENAME)).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _retry_after(error: openai.RateLimitError, attempt: int) -> float:
+    """
+    Get the delay before retrying a rate-limited request.
+    
+    Args:
+        error: Rate limit error from the OpenAI API
+        attempt: Zero-based attempt number
+        
+    Returns:
+        Delay in seconds, from the Retry-After header or exponential backoff
+    """
+    try:
+        return float(error.response.headers['retry-after'])
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return float(2 ** attempt)
+
+
+def _fast_split(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """
+    Split text into overlapping chunks in a single regex pass.
+    
+    Boundaries are collected once with a compiled regex, then chunks are
+    packed greedily, preferring paragraph, line, sentence and word breaks
+    in that order.
+    
+    Args:
+        text: Text to split
+        chunk_size: Maximum chunk length in characters
+        chunk_overlap: Approximate overlap between consecutive chunks
+        
+    Returns:
+        List of text chunks
+    """
+    boundaries = tuple([] for _ in SEPARATORS)
+    for match in _SPLIT_RE.finditer(text):
+        boundaries[_SEPARATOR_RANK[match.group()]].append(match.end())
+    
+    chunks = []
+    start = 0
+    length = len(text)
+    
+    while start < length:
+        limit = start + chunk_size
+        end = min(limit, length)
+        
+        # Prefer the coarsest separator in the second half of the window
+        if limit < length:
+            for positions in boundaries:
+                i = bisect_right(positions, limit) - 1
+                if i >= 0 and positions[i] > start + chunk_size // 2:
+                    end = positions[i]
+                    break
+        
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        
+        if end >= length:
+            break
+        
+        # Step back so consecutive chunks overlap, starting on a separator
+        next_start = end
+        for positions in boundaries:
+            i = bisect_left(positions, end - chunk_overlap)
+            if i < len(positions) and start < positions[i] < next_start:
+                next_start = positions[i]
+        start = next_start
+    
+    return chunks
+
+
+def _split_document(document_path: str) -> tuple:
+    """
+    Load a processed document and split it into chunks.
+    
+    Args:
+        document_path: Path to the processed document
+        
+    Returns:
+        Tuple of (text chunks, metadata)
+    """
+    # Load document
+    with open(document_path, 'rb') as f:
+        document = orjson.loads(f.read())
+    
+    content = document.get('content', '')
+    base = {
+        'source': document.get('source', document_path),
+        'title': document.get('title', os.path.basename(document_path)),
+        'document_path': document_path
+    }
+    
+    # Split text into chunks
+    chunks = _fast_split(content)
+    
+    # Create metadata for each chunk; only the chunk index differs
+    metadata = [{**base, 'chunk': i} for i in range(len(chunks))]
+    
+    return chunks, metadata
+
+
+def _process_doc_worker(document_path: str) -> tuple:
+    """
+    Process a document for indexing in a worker process.
+    
+    Args:
+        document_path: Path to the processed document
+        
+    Returns:
+        Tuple of (text chunks, metadata, space-separated unique keywords),
+        or None if the document failed
+    """
+    try:
+        chunks, metadata = _split_document(document_path)
+        keywords = ' '.join(dict.fromkeys(extract_keywords(' '.join(chunks))))
+        return chunks, metadata, keywords
+    except Exception as e:
+        logger.error(f"Error processing document {document_path}: {str(e)}")
+        return None
+
+
 class DocumentIndexer:
     """Indexer for legal documents."""
     
-    def __init__(self):
-        """Initialize the document indexer."""
-        self.embedding_model = OpenAIEmbeddings()
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " ", ""]
-        )
+    def __init__(self, batch_size: int = 166, max_concurrency: int = 4):
+        """
+        Initialize the document indexer.
+        
+        Args:
+            batch_size: Number of chunks written to the vector store per insert
+            max_concurrency: Maximum number of embedding requests in flight
+        """
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.embedding_model = get_embeddings()
     
     def index_directory(self, input_dir: str, index_dir: str) -> None:
         """
@@ -49,31 +279,72 @@ class DocumentIndexer:
             os.makedirs(index_dir)
         
         # Discover all processed documents
-        documents = []
-        for root, _, files in os.walk(input_dir):
-            for file in files:
-                if file.endswith('.json'):
-                    file_path = os.path.join(root, file)
-                    documents.append(file_path)
+        documents = list(_iter_json(input_dir))
         
         logger.info(f"Found {len(documents)} documents to index")
         
-        # Load and process documents
-        all_chunks = []
-        metadatas = []
+        collection = self._open_collection(index_dir)
+        
+        # Only re-index documents whose content changed since the last run
+        previous = self._load_manifest(index_dir)
+        manifest = {path: _file_digest(path) for path in documents}
+        documents = [path for path in documents if previous.get(path) != manifest[path]]
         
-        for document_path in tqdm(documents, desc="Processing documents for indexing"):
-            try:
-                chunks, metadata = self.process_document_for_indexing(document_path)
-                all_chunks.extend(chunks)
-                metadatas.extend(metadata)
-            except Exception as e:
-                logger.error(f"Error processing document {document_path}: {str(e)}")
+        logger.info(f"{len(documents)} documents are new or changed since the last run")
         
-        logger.info(f"Created {len(all_chunks)} chunks for indexing")
+        # Drop chunks and keywords of documents that were modified or removed
+        keyword_index = open_keyword_index(index_dir)
+        for path in previous:
+            if manifest.get(path) != previous[path]:
+                collection.delete(where={'document_path': path})
+                keyword_index.execute("DELETE FROM documents WHERE document_path = ?", (path,))
         
-        # Create and save the vector store
-        self.create_vector_store(all_chunks, metadatas, index_dir)
+        pending_chunks: List[str] = []
+        pending_metadatas: List[Dict[str, Any]] = []
+        total_chunks = 0
+        
+        # Parsing and splitting is CPU-bound, so spread it across processes.
+        # Documents are submitted a window at a time and chunks are written
+        # as they accumulate, so memory stays bounded on large corpora.
+        with ProcessPoolExecutor() as executor, \
+                tqdm(total=len(documents), desc="Processing documents for indexing") as progress:
+            for start in range(0, len(documents), STREAM_WINDOW_DOCUMENTS):
+                window = documents[start:start + STREAM_WINDOW_DOCUMENTS]
+                results = executor.map(_process_doc_worker, window, chunksize=16)
+                for path, result in zip(window, results):
+                    progress.update()
+                    if result is None:
+                        # Leave failed documents out of the manifest so the next run retries them
+                        del manifest[path]
+                        continue
+                    
+                    chunks, metadata, keywords = result
+                    # Replace keywords left by an earlier run that failed before saving the manifest
+                    keyword_index.execute("DELETE FROM documents WHERE document_path = ?", (path,))
+                    if keywords:
+                        keyword_index.execute(
+                            "INSERT INTO documents (document_path, keywords) VALUES (?, ?)",
+                            (path, keywords)
+                        )
+                    pending_chunks.extend(chunks)
+                    pending_metadatas.extend(metadata)
+                    total_chunks += len(chunks)
+                    
+                    if len(pending_chunks) >= STREAM_FLUSH_CHUNKS:
+                        self._add_chunks(collection, pending_chunks, pending_metadatas)
+                        pending_chunks, pending_metadatas = [], []
+        
+        if pending_chunks:
+            self._add_chunks(collection, pending_chunks, pending_metadatas)
+        
+        logger.info(f"Created {total_chunks} chunks for indexing")
+        
+        keyword_index.commit()
+        keyword_index.close()
+        
+        self._save_splitter_config(index_dir)
+        self._save_manifest(index_dir, manifest)
+        logger.info(f"Vector store created and saved to {index_dir}")
     
     def process_document_for_indexing(self, document_path: str) -> tuple:
         """
@@ -85,28 +356,7 @@ class DocumentIndexer:
         Returns:
             Tuple of (text chunks, metadata)
         """
-        # Load document
-        with open(document_path, 'r', encoding='utf-8') as f:
-            document = json.load(f)
-        
-        content = document.get('content', '')
-        source = document.get('source', document_path)
-        title = document.get('title', os.path.basename(document_path))
-        
-        # Split text into chunks
-        chunks = self.text_splitter.split_text(content)
-        
-        # Create metadata for each chunk
-        metadata = []
-        for i, _ in enumerate(chunks):
-            metadata.append({
-                'source': source,
-                'title': title,
-                'chunk': i,
-                'document_path': document_path
-            })
-        
-        return chunks, metadata
+        return _split_document(document_path)
     
     def create_vector_store(self, texts: List[str], metadatas: List[Dict[str, Any]], index_dir: str) -> None:
         """
@@ -117,20 +367,191 @@ class DocumentIndexer:
             metadatas: List of metadata dictionaries
             index_dir: Output directory for the index
         """
-        # Create the vector store
-        vector_store = Chroma.from_texts(
-            texts=texts,
-            embedding=self.embedding_model,
-            metadatas=metadatas,
-            persist_directory=index_dir
+        collection = self._open_collection(index_dir)
+        self._add_chunks(collection, texts, metadatas)
+        
+        self._save_splitter_config(index_dir)
+        logger.info(f"Vector store created and saved to {index_dir}")
+    
+    @staticmethod
+    def _open_collection(index_dir: str) -> chromadb.Collection:
+        """
+        Open the collection that Chroma(persist_directory=...) loads by default.
+        
+        Args:
+            index_dir: Directory for the index
+            
+        Returns:
+            Chroma collection
+        """
+        client = chromadb.PersistentClient(path=index_dir)
+        return client.get_or_create_collection(
+            name=Chroma._LANGCHAIN_DEFAULT_COLLECTION_NAME,
+            metadata=HNSW_COLLECTION_METADATA
         )
+    
+    @staticmethod
+    def _save_splitter_config(index_dir: str) -> None:
+        """
+        Save the chunking configuration alongside an index.
+        
+        Args:
+            index_dir: Directory for the index
+        """
+        with open(os.path.join(index_dir, 'text_splitter.json'), 'w', encoding='utf-8') as f:
+            json.dump(_SPLITTER_CONFIG, f, indent=2)
+    
+    @staticmethod
+    def _load_manifest(index_dir: str) -> Dict[str, str]:
+        """
+        Load the document hashes recorded by the last index_directory run.
         
-        # Save the text splitter configuration
-        with open(os.path.join(index_dir, 'text_splitter.pkl'), 'wb') as f:
-            pickle.dump(self.text_splitter, f)
+        Args:
+            index_dir: Directory for the index
+            
+        Returns:
+            Mapping of document path to SHA-256 hex digest
+        """
+        manifest_path = os.path.join(index_dir, MANIFEST_FILENAME)
+        if not os.path.exists(manifest_path):
+            return {}
         
-        logger.info(f"Vector store created and saved to {index_dir}")
+        with open(manifest_path, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    @staticmethod
+    def _save_manifest(index_dir: str, manifest: Dict[str, str]) -> None:
+        """
+        Save the document hashes for the current index contents.
+        
+        Args:
+            index_dir: Directory for the index
+            manifest: Mapping of document path to SHA-256 hex digest
+        """
+        with open(os.path.join(index_dir, MANIFEST_FILENAME), 'wb') as f:
+            f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+    
+    def _add_chunks(self, collection: chromadb.Collection, texts: List[str],
+                    metadatas: List[Dict[str, Any]]) -> None:
+        """
+        Embed and insert chunks not already stored in the collection.
+        
+        Args:
+            collection: Chroma collection to write to
+            texts: List of text chunks
+            metadatas: List of metadata dictionaries
+        """
+        # Collapse chunks repeated within a document
+        texts, metadatas, ids = self._dedupe_chunks(texts, metadatas)
+        
+        # Skip chunks the collection already holds, e.g. from an interrupted run
+        existing: Set[str] = set()
+        for i in range(0, len(ids), ID_LOOKUP_BATCH):
+            existing.update(collection.get(ids=ids[i:i + ID_LOOKUP_BATCH], include=[])['ids'])
+        if existing:
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+            logger.info(f"Skipped {len(ids) - len(keep)} chunks already in the vector store")
+            texts = [texts[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+            ids = [ids[i] for i in keep]
+        
+        if not texts:
+            return
+        
+        # Text shared by several documents (boilerplate, quotations) is embedded
+        # once, but every document keeps its own copy of the chunk
+        distinct = list(dict.fromkeys(texts))
+        if len(distinct) < len(texts):
+            logger.info(f"Embedding {len(distinct)} distinct texts for {len(texts)} chunks")
+        rows = {text: i for i, text in enumerate(distinct)}
+        embeddings = asyncio.run(self._embed_all_async(distinct))[[rows[text] for text in texts]]
+        
+        # Insert chunks in batches; only the current batch is expanded to Python lists
+        for i in tqdm(range(0, len(texts), self.batch_size), desc="Adding chunks to vector store", leave=False):
+            collection.add(
+                ids=ids[i:i + self.batch_size],
+                embeddings=embeddings[i:i + self.batch_size].tolist(),
+                documents=texts[i:i + self.batch_size],
+                metadatas=metadatas[i:i + self.batch_size]
+            )
+    
+    @staticmethod
+    def _dedupe_chunks(texts: List[str], metadatas: List[Dict[str, Any]]
+                       ) -> Tuple[List[str], List[Dict[str, Any]], List[str]]:
+        """
+        Drop chunks repeated within the same document.
+        
+        Chunks are keyed by a hash of their document path and text, so
+        re-indexing a document reuses its ids, while a document sharing text
+        with others keeps its own chunk. Each chunk can then be found through
+        a document_path filter and deleted with its document.
+        The number of copies dropped is recorded on the kept chunk.
+        
+        Args:
+            texts: List of text chunks
+            metadatas: List of metadata dictionaries
+            
+        Returns:
+            Tuple of (unique texts, their metadata, chunk ids)
+        """
+        positions: Dict[str, int] = {}
+        unique_texts, unique_metadatas, ids = [], [], []
+        
+        for text, metadata in zip(texts, metadatas):
+            key = f"{metadata.get('document_path', '')}\0{text}"
+            chunk_id = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+            index = positions.get(chunk_id)
+            if index is None:
+                positions[chunk_id] = len(unique_texts)
+                unique_texts.append(text)
+                unique_metadatas.append(metadata)
+                ids.append(chunk_id)
+            else:
+                canonical = unique_metadatas[index]
+                canonical['duplicates'] = canonical.get('duplicates', 0) + 1
+        
+        duplicates = len(texts) - len(unique_texts)
+        if duplicates:
+            logger.info(f"Skipped {duplicates} duplicate chunks out of {len(texts)}")
+        
+        return unique_texts, unique_metadatas, ids
+        
+    async def _embed_all_async(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts with concurrent requests to the embedding API.
+        
+        Args:
+            texts: List of text chunks
+            
+        Returns:
+            float32 array of embeddings, one row per text in the same order
+        """
+        chunk_size = self.embedding_model.chunk_size
+        semaphore = asyncio.Semaphore(self.max_concurrency)
         
+        async def embed_batch(batch: List[str]) -> np.ndarray:
+            # Retries hold the semaphore so rate-limited batches don't pile up
+            async with semaphore:
+                for attempt in range(EMBED_MAX_RETRIES):
+                    try:
+                        embeddings = await self.embedding_model.aembed_documents(batch)
+                        break
+                    except openai.RateLimitError as e:
+                        if attempt == EMBED_MAX_RETRIES - 1:
+                            raise
+                        delay = _retry_after(e, attempt)
+                        logger.warning(f"Embedding rate limited, retrying in {delay:.1f}s")
+                        await asyncio.sleep(delay + random.uniform(0, 0.25 * delay))
+            return np.asarray(embeddings, dtype=np.float32)
+        
+        batches = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+        
+        if not results:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        return np.concatenate(results)
+    
     def load_vector_store(self, index_dir: str) -> Chroma:
         """
         Load a vector store from disk.
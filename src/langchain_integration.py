@@ -3,17 +3,27 @@ LangChain integration module for the legal search agent.
 """
 
 import os
+import copy
+import queue
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 
+import numpy as np
 from langchain.chains import RetrievalQA, ConversationalRetrievalChain
 from langchain.prompts import PromptTemplate
-from langchain.memory import ConversationBufferMemory
+from langchain.memory import ConversationSummaryBufferMemory
 from langchain_openai import OpenAI, ChatOpenAI
 from langchain.retrievers import ContextualCompressionRetriever
-from langchain.retrievers.document_compressors import LLMChainExtractor
+from langchain.retrievers.document_compressors import EmbeddingsFilter
 from langchain.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain.callbacks.base import BaseCallbackHandler
+
+from src.indexer import index_version
+from src.openai_clients import get_embeddings, get_http_client
 
 # Set up logging
 logging.basicConfig(
@@ -26,8 +36,161 @@ logging.basicConfig(
 )
 logger = logging.getLogger('LangChainIntegration')
 
+
+@functools.lru_cache(maxsize=4)
+def _open_chroma(path: str) -> Chroma:
+    """
+    Open a persisted vector store, reusing it for repeated loads of the same path.
+    
+    Args:
+        path: Path to the vector store directory
+        
+    Returns:
+        Loaded vector store
+    """
+    return Chroma(persist_directory=path, embedding_function=get_embeddings())
+
+
+@functools.lru_cache(maxsize=8)
+def _chat_model(model_name: str, streaming: bool = False) -> ChatOpenAI:
+    """
+    Get a chat model client, shared by every instance using the same model.
+    
+    Args:
+        model_name: OpenAI model name
+        streaming: Stream generated tokens to callback handlers
+        
+    Returns:
+        Chat model client
+    """
+    return ChatOpenAI(model_name=model_name, temperature=0, streaming=streaming,
+                      http_client=get_http_client())
+
+
+class _SemanticCache:
+    """Thread-safe LRU cache of answers keyed by normalized query embeddings."""
+    
+    def __init__(self, threshold: float, size: int):
+        """
+        Initialize the semantic cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a cache hit
+            size: Maximum number of cached answers
+        """
+        self.threshold = threshold
+        self.size = size
+        
+        # (normalized query embedding, result) pairs, least recently used first
+        self._entries: List[Tuple[np.ndarray, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+    
+    def lookup(self, query_vector: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached result for a semantically similar query.
+        
+        Args:
+            query_vector: Normalized query embedding
+            
+        Returns:
+            Cached result or None if no cached query is similar enough
+        """
+        with self._lock:
+            if not self._entries:
+                return None
+            
+            scores = np.stack([vector for vector, _ in self._entries]) @ query_vector
+            best = int(np.argmax(scores))
+            
+            if scores[best] <= self.threshold:
+                return None
+            
+            # Mark the entry as most recently used
+            entry = self._entries.pop(best)
+            self._entries.append(entry)
+            
+            # Callers may modify the result, so hand out a copy
+            return copy.deepcopy(entry[1])
+    
+    def store(self, query_vector: np.ndarray, result: Dict[str, Any]) -> None:
+        """
+        Add a query result to the semantic cache.
+        
+        Args:
+            query_vector: Normalized query embedding
+            result: Query result
+        """
+        result = copy.deepcopy(result)
+        with self._lock:
+            self._entries.append((query_vector, result))
+            
+            # Evict the least recently used entry
+            if len(self._entries) > self.size:
+                self._entries.pop(0)
+
+
+@functools.lru_cache(maxsize=4)
+def _semantic_cache(path: str, model_name: str, version: int) -> _SemanticCache:
+    """
+    Get the semantic answer cache shared by every instance on a vector store.
+    
+    QA answers don't depend on conversation memory, so instances created for
+    different users can share them.
+    
+    Args:
+        path: Path to the vector store directory
+        model_name: OpenAI model name generating the answers
+        version: Index version the answers were generated from
+        
+    Returns:
+        Semantic cache for the vector store, model and index version
+    """
+    return _SemanticCache(LegalLangChain.SEMANTIC_CACHE_THRESHOLD, LegalLangChain.SEMANTIC_CACHE_SIZE)
+
+
+def _answer_cache(path: str, model_name: str) -> _SemanticCache:
+    """
+    Get the semantic answer cache for the current contents of a vector store.
+    
+    Re-indexing changes the index version, so answers from the old index are
+    no longer served.
+    
+    Args:
+        path: Path to the vector store directory
+        model_name: OpenAI model name generating the answers
+        
+    Returns:
+        Semantic cache for the vector store and model
+    """
+    path = os.path.abspath(path)
+    return _semantic_cache(path, model_name, index_version(path))
+
+
+class _TokenQueueHandler(BaseCallbackHandler):
+    """Callback handler that forwards streamed LLM tokens to a queue."""
+    
+    def __init__(self):
+        self.tokens: "queue.Queue[Optional[str]]" = queue.Queue()
+    
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.tokens.put(token)
+
+
 class LegalLangChain:
-    """LangChain integration for the legal search agent."""
+    """
+    LangChain integration for the legal search agent.
+    
+    Each instance holds its own conversation memory, so use one instance per
+    user. The embedding model, chat model clients, vector store and semantic
+    answer cache are shared between instances.
+    """
+    
+    # Semantic cache settings for query()
+    SEMANTIC_CACHE_THRESHOLD = 0.95  # Minimum cosine similarity for a cache hit
+    SEMANTIC_CACHE_SIZE = 1024  # Maximum number of cached answers
+    
+    # Chat history tokens kept verbatim before older turns are summarized
+    MEMORY_TOKEN_LIMIT = 2000
     
     def __init__(self, vector_store_path: str, model_name: str = "gpt-3.5-turbo"):
         """
@@ -41,12 +204,17 @@ class LegalLangChain:
         self.model_name = model_name
         
         # Initialize components
-        self.embeddings = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(model_name=model_name, temperature=0)
+        self.embeddings = get_embeddings()
+        self.llm = _chat_model(model_name)
+        # Answers are generated by a streaming model so chat_stream can emit tokens
+        self.streaming_llm = _chat_model(model_name, streaming=True)
         self.vector_store = self._load_vector_store()
         self.retriever = self._setup_retriever()
-        self.memory = ConversationBufferMemory(
+        self.memory = ConversationSummaryBufferMemory(
+            llm=self.llm,
+            max_token_limit=self.MEMORY_TOKEN_LIMIT,
             memory_key="chat_history",
+            output_key="answer",
             return_messages=True
         )
         
@@ -68,13 +236,8 @@ class LegalLangChain:
             logger.error(f"Vector store not found at {self.vector_store_path}")
             raise FileNotFoundError(f"Vector store not found at {self.vector_store_path}")
         
-        # Load the vector store
-        vector_store = Chroma(
-            persist_directory=self.vector_store_path,
-            embedding_function=self.embeddings
-        )
-        
-        return vector_store
+        # Load the vector store, shared with other instances on the same path
+        return _open_chroma(os.path.abspath(self.vector_store_path))
     
     def _setup_retriever(self) -> ContextualCompressionRetriever:
         """
@@ -89,8 +252,11 @@ class LegalLangChain:
             search_kwargs={"k": 10}
         )
         
-        # Add LLM chain extractor for better context extraction
-        compressor = LLMChainExtractor.from_llm(self.llm)
+        # Drop weakly related documents by embedding similarity (no LLM calls)
+        compressor = EmbeddingsFilter(
+            embeddings=self.embeddings,
+            similarity_threshold=0.76
+        )
         retriever = ContextualCompressionRetriever(
             base_compressor=compressor,
             base_retriever=base_retriever
@@ -145,7 +311,8 @@ class LegalLangChain:
         """
         # Create the conversational chain
         chain = ConversationalRetrievalChain.from_llm(
-            llm=self.llm,
+            llm=self.streaming_llm,
+            condense_question_llm=self.llm,
             retriever=self.retriever,
             memory=self.memory,
             return_source_documents=True
@@ -157,6 +324,18 @@ class LegalLangChain:
         """
         Query the QA chain.
         
+        Args:
+            query: User query
+            
+        Returns:
+            QA chain response
+        """
+        return asyncio.run(self.aquery(query))
+    
+    async def aquery(self, query: str) -> Dict[str, Any]:
+        """
+        Query the QA chain without blocking the event loop.
+        
         Args:
             query: User query
             
@@ -166,8 +345,19 @@ class LegalLangChain:
         logger.info(f"Querying QA chain: {query}")
         
         try:
+            # Answer near-duplicate queries from the semantic cache
+            query_vector = np.asarray(await self.embeddings.aembed_query(query), dtype=np.float32)
+            query_vector /= np.linalg.norm(query_vector)
+            
+            # Looked up per query so a re-index invalidates the cache of existing instances
+            cache = _answer_cache(self.vector_store_path, self.model_name)
+            cached = cache.lookup(query_vector)
+            if cached is not None:
+                logger.info(f"Semantic cache hit for query: {query}")
+                return cached
+            
             # Execute the query
-            response = self.qa_chain({"query": query})
+            response = await self.qa_chain.ainvoke({"query": query})
             
             # Format the response
             result = {
@@ -175,6 +365,8 @@ class LegalLangChain:
                 "sources": [doc.metadata for doc in response["source_documents"]]
             }
             
+            cache.store(query_vector, result)
+            
             return result
         
         except Exception as e:
@@ -188,6 +380,49 @@ class LegalLangChain:
         Args:
             query: User query
             
+        Returns:
+            Conversational chain response
+        """
+        return asyncio.run(self.achat(query))
+    
+    def chat_stream(self, query: str) -> Tuple[Iterator[str], "Future[Dict[str, Any]]"]:
+        """
+        Query the conversational chain, streaming the answer as it is generated.
+        
+        Args:
+            query: User query
+            
+        Returns:
+            Iterator over answer tokens, and a future resolving to the full
+            conversational chain response once the answer is complete
+        """
+        handler = _TokenQueueHandler()
+        response: "Future[Dict[str, Any]]" = Future()
+        
+        def run() -> None:
+            try:
+                response.set_result(asyncio.run(self.achat(query, callbacks=[handler])))
+            except Exception as e:
+                response.set_exception(e)
+            finally:
+                handler.tokens.put(None)
+        
+        threading.Thread(target=run, daemon=True).start()
+        
+        def tokens() -> Iterator[str]:
+            while (token := handler.tokens.get()) is not None:
+                yield token
+        
+        return tokens(), response
+    
+    async def achat(self, query: str, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict[str, Any]:
+        """
+        Query the conversational chain without blocking the event loop.
+        
+        Args:
+            query: User query
+            callbacks: Callback handlers for the chain run (e.g. to receive streamed tokens)
+            
         Returns:
             Conversational chain response
         """
@@ -195,7 +430,10 @@ class LegalLangChain:
         
         try:
             # Execute the query
-            response = self.conversational_chain({"question": query})
+            response = await self.conversational_chain.ainvoke(
+                {"question": query},
+                config={"callbacks": callbacks} if callbacks else None
+            )
             
             # Format the response
             result = {
@@ -3,10 +3,13 @@ LangFlow integration for the legal search agent.
 """
 
 import os
-import json
+import time
+import socket
 import logging
 import subprocess
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+import orjson
 
 # Set up logging
 logging.basicConfig(
@@ -22,6 +25,9 @@ logger = logging.getLogger('LangFlowIntegration')
 class LangFlowIntegration:
     """Class for integrating LangFlow with the legal search agent."""
     
+    # Seconds to wait for the server to accept connections after launch
+    STARTUP_TIMEOUT = 2.0
+    
     def __init__(self, flows_dir: str = "flows"):
         """
         Initialize LangFlow integration.
@@ -34,6 +40,10 @@ class LangFlowIntegration:
         # Create flows directory if it doesn't exist
         if not os.path.exists(flows_dir):
             os.makedirs(flows_dir)
+        
+        # Flow names from the last directory scan, keyed by the directory mtime
+        self._flow_cache: List[str] = []
+        self._flow_cache_mtime = 0
     
     def start_langflow_server(self, host: str = "localhost", port: int = 7860) -> None:
         """
@@ -46,24 +56,32 @@ class LangFlowIntegration:
         logger.info(f"Starting LangFlow server on {host}:{port}")
         
         try:
-            # Start LangFlow server
-            cmd = f"langflow run --host {host} --port {port}"
-            
-            # Use subprocess.Popen to run the command in the background
+            # Start LangFlow server directly, without an intermediate shell
+            args = ['langflow', 'run', '--host', str(host), '--port', str(port)]
             process = subprocess.Popen(
-                cmd,
-                shell=True,
+                args,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True
             )
             
-            # Wait a bit to check if the process started successfully
-            returncode = process.poll()
-            if returncode is not None:
-                stdout, stderr = process.communicate()
-                logger.error(f"LangFlow server failed to start: {stderr}")
-                raise RuntimeError(f"LangFlow server failed to start: {stderr}")
+            # Wait until the server accepts connections or the process exits
+            deadline = time.monotonic() + self.STARTUP_TIMEOUT
+            while True:
+                returncode = process.poll()
+                if returncode is not None:
+                    stdout, stderr = process.communicate()
+                    logger.error(f"LangFlow server failed to start: {stderr}")
+                    raise RuntimeError(f"LangFlow server failed to start: {stderr}")
+                
+                try:
+                    with socket.create_connection((host, port), timeout=0.1):
+                        break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        logger.warning(f"LangFlow server not accepting connections after {self.STARTUP_TIMEOUT}s; it may still be starting")
+                        return
+                    time.sleep(0.1)
             
             logger.info(f"LangFlow server started successfully. Access at http://{host}:{port}")
             
@@ -90,8 +108,8 @@ class LangFlowIntegration:
         flow_path = os.path.join(self.flows_dir, flow_name)
         
         # Save flow data to file
-        with open(flow_path, 'w', encoding='utf-8') as f:
-            json.dump(flow_data, f, indent=2)
+        with open(flow_path, 'wb') as f:
+            f.write(orjson.dumps(flow_data, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Flow saved to {flow_path}")
         
@@ -120,8 +138,8 @@ class LangFlowIntegration:
             raise FileNotFoundError(f"Flow not found: {flow_path}")
         
         # Load flow data from file
-        with open(flow_path, 'r', encoding='utf-8') as f:
-            flow_data = json.load(f)
+        with open(flow_path, 'rb') as f:
+            flow_data = orjson.loads(f.read())
         
         logger.info(f"Flow loaded from {flow_path}")
         
@@ -134,14 +152,13 @@ class LangFlowIntegration:
         Returns:
             List of flow names
         """
-        flows = []
-        
-        # List all JSON files in the flows directory
-        for file in os.listdir(self.flows_dir):
-            if file.endswith('.json'):
-                flows.append(file)
+        # Rescan only when files have been added, removed or renamed
+        mtime = os.stat(self.flows_dir).st_mtime_ns
+        if mtime != self._flow_cache_mtime:
+            self._flow_cache = [file for file in os.listdir(self.flows_dir) if file.endswith('.json')]
+            self._flow_cache_mtime = mtime
         
-        return flows
+        return list(self._flow_cache)
 
 
 # Pre-defined flow templates
@@ -0,0 +1,155 @@
+"""
+Shared OpenAI clients for the legal search agent.
+"""
+
+import asyncio
+import functools
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import httpx
+from langchain_openai import OpenAIEmbeddings
+
+# Connection pool shared by every synchronous OpenAI request in the process
+_HTTP_CLIENT = httpx.Client(
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+)
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Get the pooled HTTP client shared by synchronous OpenAI requests.
+    
+    Passing it to every OpenAI model lets chat and embedding requests reuse
+    keep-alive connections instead of opening a new TLS session per model.
+    
+    Returns:
+        Shared httpx client
+    """
+    return _HTTP_CLIENT
+
+
+class _QueryCachedEmbeddings(OpenAIEmbeddings):
+    """OpenAIEmbeddings that reuses the embeddings of repeated queries."""
+    
+    def embed_query(self, text: str) -> List[float]:
+        return list(_embed_query(text))
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        # Go through the cached synchronous path so async callers share hits
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_query, text)
+
+
+# Optional persistent cache consulted when a query is not cached in memory
+_query_embedding_store: Optional[Callable[[str], List[float]]] = None
+
+
+# Embeddings fetched by embed_queries for its cache misses, per thread
+_batch = threading.local()
+
+
+class _EmbeddingDeferred(Exception):
+    """Raised by embed_query_uncached while embed_queries is collecting cache misses."""
+
+
+def set_query_embedding_store(store: Optional[Callable[[str], List[float]]]) -> None:
+    """
+    Set a persistent cache for query embeddings, such as a disk-backed one.
+    
+    The store is called with the query text for queries missing from the
+    in-memory cache, and should call embed_query_uncached on its own misses.
+    Exceptions from embed_query_uncached must propagate without being cached.
+    
+    Args:
+        store: Function returning the embedding of a query, or None to remove it
+    """
+    global _query_embedding_store
+    _query_embedding_store = store
+    _embed_query.cache_clear()
+
+
+def embed_query_uncached(text: str) -> List[float]:
+    """
+    Embed a query with the shared model, always calling the API.
+    
+    Args:
+        text: Query text
+        
+    Returns:
+        Query embedding
+    """
+    fetched = getattr(_batch, 'fetched', None)
+    if fetched is not None:
+        # Inside embed_queries: answer from its batch request, or report the miss
+        if text in fetched:
+            return fetched[text]
+        raise _EmbeddingDeferred(text)
+    return OpenAIEmbeddings.embed_query(get_embeddings(), text)
+
+
+def embed_queries(texts: List[str]) -> List[List[float]]:
+    """
+    Embed several queries, reusing cached embeddings of repeated queries.
+    
+    Queries found in the in-memory cache or the persistent store are not sent
+    to the API; the rest are embedded with a single request and then cached
+    the same way as embed_query results.
+    
+    Args:
+        texts: Query texts
+        
+    Returns:
+        Query embeddings, in the same order
+    """
+    embeddings = {}
+    misses = []
+    
+    _batch.fetched = {}
+    try:
+        for text in dict.fromkeys(texts):
+            try:
+                embeddings[text] = _embed_query(text)
+            except _EmbeddingDeferred:
+                misses.append(text)
+        
+        if misses:
+            _batch.fetched.update(zip(misses, get_embeddings().embed_documents(misses)))
+            for text in misses:
+                embeddings[text] = _embed_query(text)
+    finally:
+        _batch.fetched = None
+    
+    return [list(embeddings[text]) for text in texts]
+
+
+@functools.lru_cache(maxsize=1024)
+def _embed_query(text: str) -> Tuple[float, ...]:
+    """
+    Embed a query with the shared model, reusing the result for repeated queries.
+    
+    Args:
+        text: Query text
+        
+    Returns:
+        Query embedding
+    """
+    store = _query_embedding_store
+    if store is not None:
+        return tuple(store(text))
+    return tuple(embed_query_uncached(text))
+
+
+@functools.lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    """
+    Get the process-wide embedding model.
+    
+    The model is built once and reuses a pooled HTTP client, so indexing and
+    querying in the same process share keep-alive connections to the API.
+    Query embeddings are cached, so the search engine, the LangChain
+    retrievers and the semantic answer cache embed a repeated query only once.
+    
+    Returns:
+        Shared OpenAIEmbeddings instance
+    """
+    return _QueryCachedEmbeddings(http_client=_HTTP_CLIENT)
@@ -2,14 +2,18 @@
 Document processor module for the legal search agent.
 """
 
+import io
 import os
-import json
+import mmap
 import logging
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import re
 
+import orjson
 import PyPDF2
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from tqdm import tqdm
 
 # Set up logging
@@ -23,40 +27,140 @@ logging.basicConfig(
 )
 logger = logging.getLogger('DocumentProcessor')
 
+# PDFium text extraction is much faster than PyPDF2; fall back if it isn't installed
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+# Line breaks and runs of spaces in extracted HTML text, each collapsed to one newline
+_HTML_BREAK_RE = re.compile(r'\s*\n\s*|\s{2,}')
+
+# Skips script and style subtrees while parsing HTML
+_HTML_TEXT_STRAINER = SoupStrainer(lambda name, attrs=None: name not in ('script', 'style'))
+
+# RE2 scans long text in linear time without backtracking; fall back to the
+# standard engine if it isn't installed
+try:
+    import re2 as _regex
+except ImportError:
+    _regex = re
+
+# Section headings are matched per line, where the standard engine's lower
+# per-call overhead wins; entities are matched over the whole document
+_SECTION_RE = re.compile(r'^[A-Z\s]+$')
+_ENTITY_RE = _regex.compile(
+    r'\b(?:(?P<dates>\d{1,2}[-/]\d{1,2}[-/]\d{2,4})|(?P<case_numbers>\d+\s*-\s*[a-zA-Z0-9]+))\b'
+)
+
+# The first non-empty line of a document, from its first non-whitespace character
+_TITLE_RE = re.compile(r'\S[^\n]*')
+
+# File extensions handled by process_document
+_DOCUMENT_EXTENSIONS = ('.txt', '.html', '.pdf', '.doc', '.docx')
+
+
+def _iter_documents(root: str) -> Iterator[str]:
+    """
+    Recursively yield the paths of supported documents under a directory.
+    
+    Args:
+        root: Directory to walk
+        
+    Yields:
+        Paths of documents
+    """
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_documents(entry.path)
+            elif entry.name.endswith(_DOCUMENT_EXTENSIONS):
+                yield entry.path
+
+
 class DocumentProcessor:
     """Processor for legal documents."""
     
-    def __init__(self):
-        """Initialize the document processor."""
-        pass
+    def __init__(self, pretty_json: bool = False):
+        """
+        Initialize the document processor.
+        
+        Args:
+            pretty_json: Indent processed JSON output for easier debugging
+        """
+        self.pretty_json = pretty_json
     
-    def process_directory(self, input_dir: str, output_dir: str) -> None:
+    def process_directory(self, input_dir: str, output_dir: str, skip_unchanged: bool = True) -> None:
         """
         Process all documents in a directory.
         
         Args:
             input_dir: Input directory with raw documents
             output_dir: Output directory for processed documents
+            skip_unchanged: Skip documents whose output is newer than the
+                document and its metadata file
         """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         
         # Discover all documents
-        documents = []
-        for root, _, files in os.walk(input_dir):
-            for file in files:
-                if file.endswith(('.txt', '.html', '.pdf', '.doc', '.docx')) and not file.endswith('.meta.json'):
-                    file_path = os.path.join(root, file)
-                    documents.append(file_path)
+        documents = list(_iter_documents(input_dir))
         
         logger.info(f"Found {len(documents)} documents to process")
         
-        # Process each document
-        for document in tqdm(documents, desc="Processing documents"):
-            try:
-                self.process_document(document, output_dir)
-            except Exception as e:
-                logger.error(f"Error processing document {document}: {str(e)}")
+        if skip_unchanged:
+            pending = [document for document in documents if not self._is_up_to_date(document, output_dir)]
+            logger.info(f"Skipping {len(documents) - len(pending)} documents with up-to-date output")
+            documents = pending
+        
+        # Extraction is CPU-bound and independent per file, so spread it across processes
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(self._process_document_safe, documents, repeat(output_dir), chunksize=8)
+            for _ in tqdm(results, total=len(documents), desc="Processing documents"):
+                pass
+    
+    def _is_up_to_date(self, file_path: str, output_dir: str) -> bool:
+        """
+        Check whether a document's processed output is newer than its inputs.
+        
+        Args:
+            file_path: Path to the document
+            output_dir: Output directory for processed documents
+            
+        Returns:
+            True if the output exists and is at least as new as the document and its metadata
+        """
+        try:
+            output_mtime = os.stat(self._output_path(file_path, output_dir)).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        
+        if os.stat(file_path).st_mtime_ns > output_mtime:
+            return False
+        
+        try:
+            return os.stat(f"{file_path}.meta.json").st_mtime_ns <= output_mtime
+        except FileNotFoundError:
+            return True
+    
+    def _process_document_safe(self, file_path: str, output_dir: str) -> bool:
+        """
+        Process a single document, logging instead of raising on failure.
+        
+        Args:
+            file_path: Path to the document
+            output_dir: Output directory for processed document
+            
+        Returns:
+            True if the document was processed without error
+        """
+        try:
+            self.process_document(file_path, output_dir)
+            return True
+        except Exception as e:
+            logger.error(f"Error processing document {file_path}: {str(e)}")
+            return False
     
     def process_document(self, file_path: str, output_dir: str) -> None:
         """
@@ -101,8 +205,8 @@ class DocumentProcessor:
         metadata_path = f"{file_path}.meta.json"
         
         if os.path.exists(metadata_path):
-            with open(metadata_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(metadata_path, 'rb') as f:
+                return orjson.loads(f.read())
         
         return {}
     
@@ -116,8 +220,19 @@ class DocumentProcessor:
         Returns:
             Extracted content
         """
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            return f.read()
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            
+            # Decode straight from the mapped file instead of buffering a bytes copy first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'utf-8', 'ignore')
+        
+        # Match text-mode reads, which translate all newline styles to '\n'
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        
+        return text
     
     def process_html_file(self, file_path: str) -> str:
         """
@@ -132,21 +247,14 @@ class DocumentProcessor:
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
             html_content = f.read()
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.extract()
+        # Parse without script and style elements
+        soup = BeautifulSoup(html_content, 'lxml', parse_only=_HTML_TEXT_STRAINER)
         
-        # Get text
-        text = soup.get_text(separator=' ')
+        # Get text, one stripped text node per line
+        text = soup.get_text(separator='\n', strip=True)
         
         # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        return text
+        return _HTML_BREAK_RE.sub('\n', text)
     
     def process_pdf_file(self, file_path: str) -> str:
         """
@@ -158,18 +266,49 @@ class DocumentProcessor:
         Returns:
             Extracted content
         """
-        text = ""
+        if PDFIUM_AVAILABLE:
+            return self._extract_pdf_text_pdfium(file_path)
+        
+        parts = []
         
         try:
+            # Read the whole file once; the reader seeks around it heavily
             with open(file_path, 'rb') as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(f.read()))
+            
+            for page in pdf_reader.pages:
+                parts.append(page.extract_text() or "")
         except Exception as e:
             logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
         
-        return text
+        return "\n".join(parts)
+    
+    def _extract_pdf_text_pdfium(self, file_path: str) -> str:
+        """
+        Extract the text of a PDF file with PDFium.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Returns:
+            Extracted content
+        """
+        parts = []
+        
+        try:
+            pdf = pdfium.PdfDocument(file_path)
+            try:
+                for page in pdf:
+                    textpage = page.get_textpage()
+                    parts.append(textpage.get_text_range().replace('\r\n', '\n'))
+                    textpage.close()
+                    page.close()
+            finally:
+                pdf.close()
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF {file_path}: {str(e)}")
+        
+        return "\n".join(parts)
     
     def process_word_file(self, file_path: str) -> str:
         """
@@ -199,9 +338,7 @@ class DocumentProcessor:
             Structured content dictionary
         """
         # Extract key information
-        title = self.extract_title(content, file_path)
-        sections = self.extract_sections(content)
-        entities = self.extract_entities(content)
+        title, sections, entities = self._analyze_content(content, file_path)
         
         # Create structured content
         structured_content = {
@@ -215,6 +352,24 @@ class DocumentProcessor:
         
         return structured_content
     
+    def _analyze_content(self, content: str, file_path: str) -> Tuple[str, List[Dict[str, Any]], Dict[str, List[str]]]:
+        """
+        Extract the title, sections and entities from the content.
+        
+        Args:
+            content: Document content
+            file_path: Path to the document
+            
+        Returns:
+            Tuple of (title, section dictionaries, entities)
+        """
+        # Split the content once; the first line is the title and every line
+        # feeds section detection, instead of a separate scan for each
+        lines = self._content_lines(content)
+        title = lines[0] if lines else os.path.basename(file_path)
+        
+        return title, self._sections_from_lines(lines), self.extract_entities(content)
+    
     def extract_title(self, content: str, file_path: str) -> str:
         """
         Extract the title from the content.
@@ -226,12 +381,11 @@ class DocumentProcessor:
         Returns:
             Extracted title
         """
-        # Simple heuristic: Use the first non-empty line as the title
-        lines = content.strip().split('\n')
-        for line in lines:
-            line = line.strip()
-            if line:
-                return line
+        # Simple heuristic: Use the first non-empty line as the title.
+        # The search stops at that line instead of splitting the whole document.
+        match = _TITLE_RE.search(content)
+        if match:
+            return match.group().rstrip()
         
         # Fallback to file name
         return os.path.basename(file_path)
@@ -246,22 +400,39 @@ class DocumentProcessor:
         Returns:
             List of section dictionaries
         """
-        sections = []
+        return self._sections_from_lines(self._content_lines(content))
+    
+    @staticmethod
+    def _content_lines(content: str) -> List[str]:
+        """
+        Split content into stripped, non-empty lines.
         
-        # Simple section detection: Look for capitalized lines followed by text
-        lines = content.split('\n')
+        Args:
+            content: Document content
+            
+        Returns:
+            List of lines
+        """
+        return [line for line in map(str.strip, content.split('\n')) if line]
+    
+    @staticmethod
+    def _sections_from_lines(lines: List[str]) -> List[Dict[str, Any]]:
+        """
+        Group stripped, non-empty lines into sections.
+        
+        Args:
+            lines: Lines of the document
+            
+        Returns:
+            List of section dictionaries
+        """
+        sections = []
         current_section = None
         current_content = []
         
         for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
-            # Check if line is a potential section heading
-            if re.match(r'^[A-Z\s]+$', line) and len(line) < 100:
+            # Simple section detection: Look for capitalized lines followed by text
+            if _SECTION_RE.match(line) and len(line) < 100:
                 # Save previous section if exists
                 if current_section:
                     sections.append({
@@ -272,13 +443,9 @@ class DocumentProcessor:
                 # Start new section
                 current_section = line
                 current_content = []
-            else:
+            elif current_section:
                 # Add line to current section content
-                if current_section:
-                    current_content.append(line)
-                else:
-                    # Line is not part of any section
-                    pass
+                current_content.append(line)
         
         # Save last section if exists
         if current_section:
@@ -307,15 +474,9 @@ class DocumentProcessor:
             'parties': []
         }
         
-        # Simple pattern matching for case numbers
-        case_pattern = r'\b\d+\s*-\s*[a-zA-Z0-9]+\b'
-        case_matches = re.findall(case_pattern, content)
-        entities['case_numbers'] = case_matches
-        
-        # Simple pattern matching for dates
-        date_pattern = r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b'
-        date_matches = re.findall(date_pattern, content)
-        entities['dates'] = date_matches
+        # Simple pattern matching for dates and case numbers in one scan
+        for match in _ENTITY_RE.finditer(content):
+            entities[match.lastgroup].append(match.group())
         
         # Note: For more sophisticated entity extraction, you would want to use
         # named entity recognition (NER) from a library like spaCy.
@@ -332,14 +493,27 @@ class DocumentProcessor:
             output_dir: Output directory
         """
         # Generate output path
-        rel_path = os.path.relpath(original_path, os.path.dirname(original_path))
-        output_path = os.path.join(output_dir, f"{os.path.splitext(rel_path)[0]}.json")
+        output_path = self._output_path(original_path, output_dir)
         
         # Create directory if it doesn't exist
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         # Save structured content
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(structured_content, f, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(structured_content, option=orjson.OPT_INDENT_2 if self.pretty_json else None))
         
-        logger.debug(f"Saved processed document: {output_path}")
\ No newline at end of file
+        logger.debug(f"Saved processed document: {output_path}")
+    
+    def _output_path(self, original_path: str, output_dir: str) -> str:
+        """
+        Get the path a processed document is saved to.
+        
+        Args:
+            original_path: Original document path
+            output_dir: Output directory
+            
+        Returns:
+            Path of the processed JSON document
+        """
+        rel_path = os.path.relpath(original_path, os.path.dirname(original_path))
+        return os.path.join(output_dir, f"{os.path.splitext(rel_path)[0]}.json")
@@ -0,0 +1,111 @@
+"""
+Query batching for the legal search agent.
+
+Search requests that arrive close together (for example from several
+Streamlit sessions) are grouped and answered with a single
+LegalSearchEngine.batch_search call, so they share one embedding request.
+"""
+
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Any, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('query_processor.log'),
+        logging.StreamHandler()
+    ]
+)
+logger = logging.getLogger('QueryProcessor')
+
+class QueryProcessor:
+    """Groups concurrent search requests into batch searches."""
+    
+    def __init__(self, search_engine: Any, batch_size: int = 16, max_wait_ms: int = 75):
+        """
+        Initialize the query processor.
+        
+        Args:
+            search_engine: Search engine providing batch_search(queries, k)
+            batch_size: Maximum number of queries dispatched together
+            max_wait_ms: Longest time the first query of a batch waits for others
+                when more queries are already queued behind it
+        """
+        self.search_engine = search_engine
+        self.batch_size = batch_size
+        self.max_wait_ms = max_wait_ms
+        
+        self._queue: "queue.Queue[Tuple[str, int, Optional[Tuple[str, ...]], Future]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="QueryProcessor", daemon=True)
+        self._worker.start()
+    
+    def submit(self, query: str, k: int = 5, entities: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Search for documents matching a query as part of the next batch.
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            entities: Only search documents mentioning one of these entity names
+            
+        Returns:
+            List of search results
+        """
+        future: Future = Future()
+        self._queue.put((query, k, tuple(entities) if entities else None, future))
+        return future.result()
+    
+    def _run(self) -> None:
+        """Collect queued queries into batches and dispatch them."""
+        while True:
+            batch = [self._queue.get()]
+            
+            # A lone query is answered right away instead of waiting for company
+            if self._queue.empty():
+                self._dispatch(batch)
+                continue
+            
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+            
+            # Dispatch once the batch is full or the first query has waited long enough
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            self._dispatch(batch)
+    
+    def _dispatch(self, batch: List[Tuple[str, int, Optional[Tuple[str, ...]], Future]]) -> None:
+        """
+        Answer a batch of queries, one batch search per distinct k and entity filter.
+        
+        Args:
+            batch: Queued (query, k, entities, future) entries
+        """
+        by_options: Dict[Tuple[int, Optional[Tuple[str, ...]]], List[Tuple[str, Future]]] = {}
+        for query, k, entities, future in batch:
+            by_options.setdefault((k, entities), []).append((query, future))
+        
+        for (k, entities), entries in by_options.items():
+            try:
+                results = self.search_engine.batch_search(
+                    [query for query, _ in entries], k=k, entities=list(entities) if entities else None
+                )
+            except Exception as e:
+                logger.error(f"Error running batch of {len(entries)} searches: {str(e)}")
+                for _, future in entries:
+                    future.set_exception(e)
+                continue
+            
+            for (_, future), query_results in zip(entries, results):
+                future.set_result(query_results)
@@ -3,16 +3,18 @@ Search module for the legal search agent.
 """
 
 import os
-import json
+import sqlite3
 import logging
-from typing import Dict, List, Any, Optional
-import pickle
+import functools
+from typing import Dict, List, Any, Optional, Tuple
 
-from langchain.embeddings import OpenAIEmbeddings
+import ijson
+import orjson
 from langchain.vectorstores import Chroma
-from langchain.retrievers import ContextualCompressionRetriever
 from langchain.retrievers.document_compressors import LLMChainExtractor
-from langchain.chat_models import ChatOpenAI
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from src.openai_clients import embed_queries, get_embeddings, get_http_client
 
 # Set up logging
 logging.basicConfig(
@@ -25,9 +27,79 @@ logging.basicConfig(
 )
 logger = logging.getLogger('LegalSearchEngine')
 
+# Common words ignored by extract_keywords
+_STOPWORDS = frozenset({
+    'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'in', 'on', 'at', 'to', 'for', 'with',
+    'by', 'about', 'as', 'of', 'that', 'this', 'these', 'those'
+})
+
+
+class _KeywordTable(dict):
+    """str.translate table that lowercases alphanumerics and blanks everything else."""
+    
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        value = char.lower() if char.isalnum() else ' '
+        self[codepoint] = value
+        return value
+
+
+_KEYWORD_TABLE = _KeywordTable()
+
+# SQLite FTS5 index of document keywords, stored in the index directory
+KEYWORD_INDEX_FILENAME = 'keywords.db'
+
+
+def extract_keywords(text: str) -> List[str]:
+    """
+    Extract keywords from text.
+    
+    Args:
+        text: Input text
+        
+    Returns:
+        List of keywords
+    """
+    # This is a very simple keyword extraction algorithm
+    # In a production system, you would want to use a more sophisticated approach
+    
+    # Remove punctuation and convert to lowercase
+    cleaned_text = text.translate(_KEYWORD_TABLE)
+    
+    # Split into words
+    words = cleaned_text.split()
+    
+    # Filter out common stopwords
+    return [word for word in words if word not in _STOPWORDS and len(word) > 2]
+
+
+def open_keyword_index(index_dir: str) -> sqlite3.Connection:
+    """
+    Open the keyword index of an index directory, creating it if needed.
+    
+    Args:
+        index_dir: Directory containing the index
+        
+    Returns:
+        SQLite connection with a 'documents' FTS5 table
+    """
+    connection = sqlite3.connect(os.path.join(index_dir, KEYWORD_INDEX_FILENAME), check_same_thread=False)
+    connection.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(document_path UNINDEXED, keywords)"
+    )
+    return connection
+
+
 class LegalSearchEngine:
     """Search engine for legal documents."""
     
+    # Characters of original document content included in search results
+    ORIGINAL_PREVIEW_CHARS = 2000
+    
+    # Maximum number of keyword-matched documents searched with keyword_filter
+    KEYWORD_CANDIDATES = 50
+    
     def __init__(self, index_dir: str):
         """
         Initialize the search engine.
@@ -36,18 +108,36 @@ class LegalSearchEngine:
             index_dir: Directory containing the index
         """
         self.index_dir = index_dir
-        self.embedding_model = OpenAIEmbeddings()
-        self.llm = ChatOpenAI(temperature=0)
-        
-        # Load the vector store
-        self.vector_store = self.load_vector_store()
-        
-        # Set up the retriever with contextual compression
-        compressor = LLMChainExtractor.from_llm(self.llm)
-        self.retriever = ContextualCompressionRetriever(
-            base_compressor=compressor,
-            base_retriever=self.vector_store.as_retriever(search_kwargs={"k": 10})
-        )
+    
+    # Models and the vector store are created on first use, so utility
+    # methods such as analyze_query don't pay for them
+    
+    @functools.cached_property
+    def embedding_model(self) -> OpenAIEmbeddings:
+        """Embedding model used for queries."""
+        return get_embeddings()
+    
+    @functools.cached_property
+    def llm(self) -> ChatOpenAI:
+        """Chat model used for contextual compression."""
+        return ChatOpenAI(temperature=0, http_client=get_http_client())
+    
+    @functools.cached_property
+    def vector_store(self) -> Chroma:
+        """Vector store loaded from the index directory."""
+        return self.load_vector_store()
+    
+    @functools.cached_property
+    def compressor(self) -> LLMChainExtractor:
+        """Contextual compression applied to retrieved documents."""
+        return LLMChainExtractor.from_llm(self.llm)
+    
+    @functools.cached_property
+    def keyword_index(self) -> Optional[sqlite3.Connection]:
+        """Keyword index built alongside the vector store, if present."""
+        if not os.path.exists(os.path.join(self.index_dir, KEYWORD_INDEX_FILENAME)):
+            return None
+        return open_keyword_index(self.index_dir)
     
     def load_vector_store(self) -> Chroma:
         """
@@ -67,13 +157,18 @@ class LegalSearchEngine:
         
         return vector_store
     
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+    def search(self, query: str, k: int = 5, compress: bool = False,
+               keyword_filter: bool = False, entities: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Search for documents matching a query.
         
         Args:
             query: Search query
             k: Number of results to return
+            compress: Reduce each result to the passages relevant to the query
+                with an LLM call per result
+            keyword_filter: Only search documents that share keywords with the query
+            entities: Only search documents mentioning one of these entity names
             
         Returns:
             List of search results
@@ -81,32 +176,206 @@ class LegalSearchEngine:
         logger.info(f"Searching for: {query}")
         
         # Get the raw documents
-        docs = self.retriever.get_relevant_documents(query)
+        document_paths = self._candidate_documents(query, keyword_filter, entities)
+        pairs = self._retrieve(query, self.embedding_model.embed_query(query), k, compress, document_paths)
         
-        # Format the results
+        return self._format_results(pairs)
+    
+    def batch_search(self, queries: List[str], k: int = 5, compress: bool = False,
+                     keyword_filter: bool = False,
+                     entities: Optional[List[str]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for documents matching several queries.
+        
+        Repeated queries reuse their cached embeddings; the others are
+        embedded with a single API request.
+        
+        Args:
+            queries: Search queries
+            k: Number of results to return per query
+            compress: Reduce each result to the passages relevant to its query
+            keyword_filter: Only search documents that share keywords with each query
+            entities: Only search documents mentioning one of these entity names
+            
+        Returns:
+            List of search results for each query, in the same order
+        """
+        if not queries:
+            return []
+        
+        logger.info(f"Searching for {len(queries)} queries")
+        
+        embeddings = embed_queries(queries)
+        
+        # The entity filter is the same for every query, so look it up once
+        entity_paths = self._entity_candidates(entities) if entities else None
+        
+        return [
+            self._format_results(self._retrieve(
+                query, embedding, k, compress,
+                self._combine_candidates(
+                    self._keyword_candidates(query) if keyword_filter else None, entity_paths
+                )
+            ))
+            for query, embedding in zip(queries, embeddings)
+        ]
+    
+    def _retrieve(self, query: str, embedding: List[float], k: int, compress: bool,
+                  document_paths: Optional[List[str]] = None) -> List[Tuple[Any, float]]:
+        """
+        Retrieve the documents closest to a query embedding.
+        
+        Args:
+            query: Search query
+            embedding: Embedding of the query
+            k: Number of documents to return
+            compress: Compress the retrieved documents against the query
+            document_paths: Restrict the search to chunks of these documents
+            
+        Returns:
+            List of (document, relevance score) pairs, most relevant first
+        """
+        where = {'document_path': {'$in': document_paths}} if document_paths else None
+        pairs = self.vector_store.similarity_search_by_vector_with_relevance_scores(embedding, k=k, filter=where)
+        
+        # Convert Chroma distances to relevance scores for the collection's distance space
+        relevance = self.vector_store._select_relevance_score_fn()
+        pairs = [(doc, relevance(distance)) for doc, distance in pairs]
+        
+        if compress:
+            # Compress one document at a time so each keeps its score;
+            # documents with nothing relevant to the query are dropped
+            compressed_pairs = []
+            for doc, score in pairs:
+                compressed = self.compressor.compress_documents([doc], query)
+                if compressed:
+                    compressed_pairs.append((compressed[0], score))
+            pairs = compressed_pairs
+        
+        return pairs
+    
+    def _candidate_documents(self, query: str, keyword_filter: bool,
+                             entities: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Find the documents a query should be restricted to.
+        
+        Args:
+            query: Search query
+            keyword_filter: Restrict to documents sharing keywords with the query
+            entities: Restrict to documents mentioning one of these entity names
+            
+        Returns:
+            Paths of candidate documents, or None to search the whole store
+        """
+        return self._combine_candidates(
+            self._keyword_candidates(query) if keyword_filter else None,
+            self._entity_candidates(entities) if entities else None
+        )
+    
+    @staticmethod
+    def _combine_candidates(keyword_paths: Optional[List[str]],
+                            entity_paths: Optional[List[str]]) -> Optional[List[str]]:
+        """
+        Combine keyword and entity candidates into one document restriction.
+        
+        Args:
+            keyword_paths: Keyword candidates, or None if unrestricted
+            entity_paths: Entity candidates, or None if unrestricted
+            
+        Returns:
+            Documents in both sets, the entity candidates if the sets don't
+            overlap, or None if neither set restricts the search
+        """
+        if keyword_paths is None or entity_paths is None:
+            return entity_paths if keyword_paths is None else keyword_paths
+        
+        entity_set = set(entity_paths)
+        return [path for path in keyword_paths if path in entity_set] or entity_paths
+    
+    def _entity_candidates(self, entities: List[str]) -> Optional[List[str]]:
+        """
+        Find the documents that mention any of the given entities.
+        
+        An entity matches a document whose keywords include all of the
+        entity name's keywords.
+        
+        Args:
+            entities: Entity names
+            
+        Returns:
+            Paths of matching documents, or None if the index is missing or
+            nothing matched, in which case the whole store is searched
+        """
+        if self.keyword_index is None:
+            return None
+        
+        clauses = []
+        for entity in entities:
+            keywords = self.extract_keywords(entity)
+            if keywords:
+                clauses.append('(' + ' AND '.join('"{}"'.format(keyword.replace('"', '""')) for keyword in keywords) + ')')
+        if not clauses:
+            return None
+        
+        rows = self.keyword_index.execute(
+            "SELECT document_path FROM documents WHERE documents MATCH ?",
+            (' OR '.join(clauses),)
+        ).fetchall()
+        
+        return [row[0] for row in rows] or None
+    
+    def _keyword_candidates(self, query: str) -> Optional[List[str]]:
+        """
+        Find the documents that best match the query's keywords.
+        
+        Args:
+            query: Search query
+            
+        Returns:
+            Paths of matching documents, or None if the index is missing or
+            nothing matched, in which case the whole store is searched
+        """
+        keywords = self.extract_keywords(query)
+        if not keywords or self.keyword_index is None:
+            return None
+        
+        match = ' OR '.join('"{}"'.format(keyword.replace('"', '""')) for keyword in keywords)
+        rows = self.keyword_index.execute(
+            "SELECT document_path FROM documents WHERE documents MATCH ? ORDER BY rank LIMIT ?",
+            (match, self.KEYWORD_CANDIDATES)
+        ).fetchall()
+        
+        return [row[0] for row in rows] or None
+    
+    def _format_results(self, pairs: List[Tuple[Any, float]]) -> List[Dict[str, Any]]:
+        """
+        Format retrieved documents as search results.
+        
+        Args:
+            pairs: Retrieved (document, relevance score) pairs
+            
+        Returns:
+            List of search results
+        """
         results = []
-        for i, doc in enumerate(docs[:k]):
+        for doc, score in pairs:
             # Extract document metadata
             metadata = doc.metadata
             source = metadata.get('source', 'Unknown')
             title = metadata.get('title', 'Untitled')
             document_path = metadata.get('document_path', '')
             
-            # Calculate a simple relevance score
-            # In a production system, you would want to use the actual similarity score
-            score = 1.0 - (i * 0.1)  # Simple decreasing score based on position
-            
             # Get the document content
             content = doc.page_content
             
-            # Get the original document if available
-            original_doc = self.get_original_document(document_path)
+            # Get a preview of the original document if available
+            original_doc = self.get_document_preview(document_path)
             
             # Add result
             results.append({
                 'source': source,
                 'title': title,
-                'score': score,
+                'score': float(score),
                 'content': content,
                 'document_path': document_path,
                 'original_document': original_doc
@@ -128,11 +397,46 @@ class LegalSearchEngine:
             return None
         
         try:
-            with open(document_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            with open(document_path, 'rb') as f:
+                return orjson.loads(f.read())
+        except Exception as e:
+            logger.error(f"Error loading original document {document_path}: {str(e)}")
+            return None
+    
+    def get_document_preview(self, document_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the title, source and a content preview of the original document.
+        
+        The processed JSON is stream-parsed and reading stops once these keys
+        are found, so the sections and entities after them are never decoded.
+        The content is still decoded in full before it is cut.
+        
+        Args:
+            document_path: Path to the original document
+            
+        Returns:
+            Document preview or None if not found
+        """
+        if not document_path or not os.path.exists(document_path):
+            return None
+        
+        preview = {}
+        
+        try:
+            with open(document_path, 'rb') as f:
+                for key, value in ijson.kvitems(f, ''):
+                    if key == 'content':
+                        preview[key] = value[:self.ORIGINAL_PREVIEW_CHARS]
+                    elif key in ('title', 'source'):
+                        preview[key] = value
+                    
+                    if len(preview) == 3:
+                        break
         except Exception as e:
             logger.error(f"Error loading original document {document_path}: {str(e)}")
             return None
+        
+        return preview
     
     def analyze_query(self, query: str) -> Dict[str, Any]:
         """
@@ -165,23 +469,7 @@ class LegalSearchEngine:
         Returns:
             List of keywords
         """
-        # This is a very simple keyword extraction algorithm
-        # In a production system, you would want to use a more sophisticated approach
-        
-        # Remove punctuation and convert to lowercase
-        cleaned_text = ''.join(c.lower() if c.isalnum() else ' ' for c in text)
-        
-        # Split into words
-        words = cleaned_text.split()
-        
-        # Filter out common stopwords
-        stopwords = {'a', 'an', 'the', 'and', 'or', 'but', 'is', 'are', 'was', 'were', 
-                    'be', 'been', 'being', 'in', 'on', 'at', 'to', 'for', 'with', 
-                    'by', 'about', 'as', 'of', 'that', 'this', 'these', 'those'}
-        
-        keywords = [word for word in words if word not in stopwords and len(word) > 2]
-        
-        return keywords
+        return extract_keywords(text)
     
     def explain_results(self, query: str, results: List[Dict[str, Any]]) -> str:
         """
@@ -7,12 +7,16 @@ from previous interactions.
 """
 
 import os
-import json
 import time
+import atexit
+import sqlite3
+import threading
 import datetime
 from typing import Dict, List, Any, Optional
 import logging
 
+import orjson
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,25 +28,101 @@ logging.basicConfig(
 )
 logger = logging.getLogger('SessionManager')
 
+SESSIONS_DB_FILENAME = "sessions.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    start_time INTEGER NOT NULL,
+    last_updated INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entities (
+    session_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    metadata_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queries (
+    session_id TEXT NOT NULL,
+    query TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    params_json TEXT NOT NULL,
+    results_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    metadata_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entities_session_type ON entities(session_id, type);
+CREATE INDEX IF NOT EXISTS idx_queries_session_tool ON queries(session_id, tool);
+CREATE INDEX IF NOT EXISTS idx_messages_session_ts ON messages(session_id, ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS session_fts USING fts5(
+    content,
+    role UNINDEXED,
+    session_id UNINDEXED,
+    kind UNINDEXED,
+    tokenize='porter unicode61'
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    """
+    Serialize a value for a JSON text column.
+    
+    Args:
+        value: Value to serialize
+        
+    Returns:
+        JSON text
+    """
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+
 class SessionManager:
     """Manages chat sessions for the legal search agent."""
     
-    def __init__(self, sessions_dir: str = "sessions"):
+    def __init__(self, sessions_dir: str = "sessions", flush_interval_ms: int = 250, flush_every_n: int = 50):
         """
         Initialize the session manager.
         
         Args:
             sessions_dir: Directory for storing session data
+            flush_interval_ms: Longest time appended records stay uncommitted
+            flush_every_n: Number of appended records that forces a commit
         """
         self.sessions_dir = sessions_dir
+        self.flush_interval_ms = flush_interval_ms
+        self.flush_every_n = flush_every_n
         
         # Create sessions directory if it doesn't exist
         if not os.path.exists(sessions_dir):
             os.makedirs(sessions_dir)
         
-        # Initialize session metadata
-        self.sessions_index_path = os.path.join(sessions_dir, "sessions_index.json")
-        self.sessions_index = self._load_sessions_index()
+        # Open the session database; appends are single-row inserts
+        self.db_path = os.path.join(sessions_dir, SESSIONS_DB_FILENAME)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.executescript(_SCHEMA)
+        self._import_json_sessions()
+        self._build_search_index()
+        
+        # Appends are group-committed by flush()
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._last_updated: Dict[str, int] = {}
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
         
         # Current session
         self.current_session_id = None
@@ -54,30 +134,227 @@ class SessionManager:
             "messages": []
         }
     
-    def _load_sessions_index(self) -> Dict[str, Any]:
+    def _import_json_sessions(self) -> None:
+        """Import sessions stored by the JSON-file backend into an empty database."""
+        # user_version marks a database whose JSON sessions were already imported
+        if self._conn.execute("PRAGMA user_version").fetchone()[0]:
+            return
+        self._conn.execute("PRAGMA user_version = 1")
+        
+        index_path = os.path.join(self.sessions_dir, "sessions_index.json")
+        if not os.path.exists(index_path):
+            return
+        
+        try:
+            with open(index_path, 'rb') as f:
+                sessions_index = orjson.loads(f.read())
+        except Exception as e:
+            logger.error(f"Error loading sessions index: {str(e)}")
+            return
+        
+        imported = 0
+        with self._conn:
+            for session_meta in sessions_index.get("sessions", []):
+                session_id = session_meta["id"]
+                session_path = os.path.join(self.sessions_dir, f"{session_id}.json")
+                if not os.path.exists(session_path):
+                    continue
+                
+                try:
+                    with open(session_path, 'rb') as f:
+                        session_data = orjson.loads(f.read())
+                except Exception as e:
+                    logger.error(f"Error loading session {session_id}: {str(e)}")
+                    continue
+                
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (id, name, start_time, last_updated) VALUES (?, ?, ?, ?)",
+                    (session_id, session_meta.get("name"), session_meta["start_time"],
+                     session_meta.get("last_updated", session_meta["start_time"]))
+                )
+                self._conn.executemany(
+                    "INSERT INTO entities (session_id, type, name, ts, metadata_json) VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, e["type"], e["name"], e["timestamp"], _dumps(e.get("metadata", {})))
+                     for e in session_data.get("entities", [])]
+                )
+                self._conn.executemany(
+                    "INSERT INTO queries (session_id, query, tool, ts, params_json, results_json) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, q["query"], q["tool"], q["timestamp"],
+                      _dumps(q.get("parameters", {})), _dumps(q.get("results", [])))
+                     for q in session_data.get("queries", [])]
+                )
+                self._conn.executemany(
+                    "INSERT INTO messages (session_id, role, content, ts, metadata_json) VALUES (?, ?, ?, ?, ?)",
+                    [(session_id, m["role"], m["content"], m["timestamp"], _dumps(m.get("metadata", {})))
+                     for m in session_data.get("messages", [])]
+                )
+                imported += 1
+        
+        if imported:
+            logger.info(f"Imported {imported} JSON sessions into {self.db_path}")
+    
+    def flush(self) -> None:
+        """Commit appended records that have not been committed yet."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            
+            if self._pending:
+                try:
+                    if self._last_updated:
+                        self._conn.executemany(
+                            "UPDATE sessions SET last_updated = ? WHERE id = ?",
+                            [(timestamp, session_id) for session_id, timestamp in self._last_updated.items()]
+                        )
+                        self._last_updated.clear()
+                    self._conn.commit()
+                except Exception as e:
+                    logger.error(f"Error saving session {self.current_session_id}: {str(e)}")
+                self._pending = 0
+    
+    def close(self) -> None:
+        """Commit pending appends and close the session database."""
+        self.flush()
+        atexit.unregister(self.flush)
+        self._conn.close()
+    
+    def _mark_dirty(self) -> None:
+        """Record an uncommitted append and commit once the batch is full or old enough."""
+        self._pending += 1
+        if self._pending >= self.flush_every_n:
+            self.flush()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval_ms / 1000, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _build_search_index(self) -> None:
+        """Fill the full-text index from rows written before it existed."""
+        # user_version 2 marks a database whose full-text index is populated
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= 2:
+            return
+        
+        with self._conn:
+            self._conn.execute("DELETE FROM session_fts")
+            self._conn.execute(
+                "INSERT INTO session_fts (content, role, session_id, kind) "
+                "SELECT name, NULL, session_id, 'entity' FROM entities ORDER BY rowid"
+            )
+            self._conn.execute(
+                "INSERT INTO session_fts (content, role, session_id, kind) "
+                "SELECT query, NULL, session_id, 'query' FROM queries ORDER BY rowid"
+            )
+            self._conn.execute(
+                "INSERT INTO session_fts (content, role, session_id, kind) "
+                "SELECT content, role, session_id, 'message' FROM messages ORDER BY rowid"
+            )
+            self._conn.execute("PRAGMA user_version = 2")
+    
+    def _index_text(self, kind: str, content: str, role: Optional[str] = None) -> None:
+        """
+        Add a piece of current-session text to the full-text index.
+        
+        Args:
+            kind: Kind of record ("entity", "query" or "message")
+            content: Text to index
+            role: Message role, for messages
+        """
+        self._conn.execute(
+            "INSERT INTO session_fts (content, role, session_id, kind) VALUES (?, ?, ?, ?)",
+            (content, role, self.current_session_id, kind)
+        )
+    
+    def _read_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a session and its records from the database.
+        
+        Args:
+            session_id: Session ID to read
+            
+        Returns:
+            Session data, or None if the session does not exist
+        """
+        row = self._conn.execute(
+            "SELECT id, name, start_time FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        entities = [
+            {"type": r["type"], "name": r["name"], "timestamp": r["ts"],
+             "metadata": orjson.loads(r["metadata_json"])}
+            for r in self._conn.execute(
+                "SELECT type, name, ts, metadata_json FROM entities WHERE session_id = ? ORDER BY rowid",
+                (session_id,)
+            )
+        ]
+        queries = [
+            {"query": r["query"], "tool": r["tool"], "timestamp": r["ts"],
+             "parameters": orjson.loads(r["params_json"]), "results": orjson.loads(r["results_json"])}
+            for r in self._conn.execute(
+                "SELECT query, tool, ts, params_json, results_json FROM queries WHERE session_id = ? ORDER BY rowid",
+                (session_id,)
+            )
+        ]
+        messages = [
+            {"role": r["role"], "content": r["content"], "timestamp": r["ts"],
+             "metadata": orjson.loads(r["metadata_json"])}
+            for r in self._conn.execute(
+                "SELECT role, content, ts, metadata_json FROM messages WHERE session_id = ? ORDER BY ts, rowid",
+                (session_id,)
+            )
+        ]
+        
+        counters = self._new_counters()
+        for entity in entities:
+            self._count(counters["entity_types"], entity["type"])
+        for query in queries:
+            self._count(counters["tool_usage"], query["tool"])
+        for message in messages:
+            self._count(counters["message_roles"], message["role"])
+        
+        return {
+            "id": row["id"],
+            "name": row["name"],
+            "start_time": row["start_time"],
+            "entities": entities,
+            "queries": queries,
+            "messages": messages,
+            "_counters": counters
+        }
+    
+    @staticmethod
+    def _new_counters() -> Dict[str, Dict[str, int]]:
         """
-        Load the sessions index file.
+        Create empty running counters for a session.
         
         Returns:
-            Sessions index data
+            Counters for entity types, tool usage and message roles
         """
-        if os.path.exists(self.sessions_index_path):
-            try:
-                with open(self.sessions_index_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading sessions index: {str(e)}")
-                return {"sessions": []}
-        else:
-            return {"sessions": []}
+        return {"entity_types": {}, "tool_usage": {}, "message_roles": {}}
     
-    def _save_sessions_index(self) -> None:
-        """Save the sessions index file."""
-        try:
-            with open(self.sessions_index_path, 'w', encoding='utf-8') as f:
-                json.dump(self.sessions_index, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving sessions index: {str(e)}")
+    @staticmethod
+    def _count(counter: Dict[str, int], key: str) -> None:
+        """
+        Increment a running counter.
+        
+        Args:
+            counter: Counter to update
+            key: Key to increment
+        """
+        counter[key] = counter.get(key, 0) + 1
+    
+    def _touch_session(self, timestamp: int) -> None:
+        """
+        Record the last-updated time of the current session.
+        
+        The sessions row is updated once per flush rather than per append.
+        
+        Args:
+            timestamp: Time of the latest change
+        """
+        self._last_updated[self.current_session_id] = timestamp
     
     def create_session(self, session_name: Optional[str] = None) -> str:
         """
@@ -89,30 +366,28 @@ class SessionManager:
         Returns:
             Session ID
         """
-        # Generate session ID
         timestamp = int(time.time())
-        session_id = f"session_{timestamp}"
         
         # Set session name
         if not session_name:
             # Generate a default name based on date and time
-            now = datetime.datetime.now()
+            now = datetime.datetime.fromtimestamp(timestamp)
             session_name = f"Session {now.strftime('%Y-%m-%d %H:%M')}"
         
-        # Create session metadata
-        session_meta = {
-            "id": session_id,
-            "name": session_name,
-            "start_time": timestamp,
-            "last_updated": timestamp,
-            "entity_count": 0,
-            "query_count": 0,
-            "message_count": 0
-        }
-        
-        # Add to sessions index
-        self.sessions_index["sessions"].append(session_meta)
-        self._save_sessions_index()
+        with self._lock:
+            # Generate session ID, suffixed if another session started in the same second
+            session_id = f"session_{timestamp}"
+            suffix = 1
+            while self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone():
+                suffix += 1
+                session_id = f"session_{timestamp}_{suffix}"
+            
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO sessions (id, name, start_time, last_updated) VALUES (?, ?, ?, ?)",
+                    (session_id, session_name, timestamp, timestamp)
+                )
+            self.flush()
         
         # Initialize current session
         self.current_session_id = session_id
@@ -122,12 +397,10 @@ class SessionManager:
             "start_time": timestamp,
             "entities": [],
             "queries": [],
-            "messages": []
+            "messages": [],
+            "_counters": self._new_counters()
         }
         
-        # Save the new session
-        self._save_current_session()
-        
         logger.info(f"Created new session: {session_id} ({session_name})")
         
         return session_id
@@ -150,59 +423,30 @@ class SessionManager:
             
         Returns:
             Session data
+            
+        Raises:
+            FileNotFoundError: If the session does not exist
         """
-        session_path = os.path.join(self.sessions_dir, f"{session_id}.json")
-        
-        if not os.path.exists(session_path):
-            logger.error(f"Session not found: {session_id}")
-            raise FileNotFoundError(f"Session not found: {session_id}")
-        
         try:
-            with open(session_path, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
-            
-            # Set as current session
-            self.current_session_id = session_id
-            self.current_session = session_data
-            
-            logger.info(f"Loaded session: {session_id}")
-            
-            return session_data
-        
+            session_data = self._read_session(session_id)
         except Exception as e:
             logger.error(f"Error loading session {session_id}: {str(e)}")
             raise
-    
-    def _save_current_session(self) -> None:
-        """Save the current session."""
-        if not self.current_session_id:
-            logger.error("No active session to save")
-            return
         
-        session_path = os.path.join(self.sessions_dir, f"{self.current_session_id}.json")
+        if session_data is None:
+            logger.error(f"Session not found: {session_id}")
+            raise FileNotFoundError(f"Session not found: {session_id}")
         
-        try:
-            with open(session_path, 'w', encoding='utf-8') as f:
-                json.dump(self.current_session, f, indent=2)
-            
-            # Update the index
-            timestamp = int(time.time())
-            for session in self.sessions_index["sessions"]:
-                if session["id"] == self.current_session_id:
-                    session["last_updated"] = timestamp
-                    session["entity_count"] = len(self.current_session["entities"])
-                    session["query_count"] = len(self.current_session["queries"])
-                    session["message_count"] = len(self.current_session["messages"])
-                    break
-            
-            self._save_sessions_index()
-            
-            logger.debug(f"Saved session: {self.current_session_id}")
+        # Set as current session
+        self.current_session_id = session_id
+        self.current_session = session_data
         
-        except Exception as e:
-            logger.error(f"Error saving session {self.current_session_id}: {str(e)}")
+        logger.info(f"Loaded session: {session_id}")
+        
+        return session_data
     
-    def add_entity(self, entity_type: str, entity_name: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    def add_entity(self, entity_type: str, entity_name: str, metadata: Optional[Dict[str, Any]] = None,
+                   timestamp: Optional[int] = None) -> None:
         """
         Add an entity to the current session.
         
@@ -210,12 +454,14 @@ class SessionManager:
             entity_type: Type of entity (e.g., "business", "person")
             entity_name: Name of the entity
             metadata: Additional metadata about the entity
+            timestamp: Time the entity was added (defaults to now)
         """
         if not self.current_session_id:
             logger.error("No active session")
             return
         
-        timestamp = int(time.time())
+        if timestamp is None:
+            timestamp = int(time.time())
         
         entity = {
             "type": entity_type,
@@ -224,12 +470,25 @@ class SessionManager:
             "metadata": metadata or {}
         }
         
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO entities (session_id, type, name, ts, metadata_json) VALUES (?, ?, ?, ?, ?)",
+                    (self.current_session_id, entity_type, entity_name, timestamp, _dumps(entity["metadata"]))
+                )
+                self._index_text("entity", entity_name)
+                self._touch_session(timestamp)
+                self._mark_dirty()
+        except Exception as e:
+            logger.error(f"Error saving session {self.current_session_id}: {str(e)}")
+        
         self.current_session["entities"].append(entity)
-        self._save_current_session()
+        self._count(self.current_session["_counters"]["entity_types"], entity_type)
         
         logger.info(f"Added entity to session: {entity_name} ({entity_type})")
     
-    def add_query(self, query: str, tool: str, parameters: Optional[Dict[str, Any]] = None, results: Optional[List[Dict[str, Any]]] = None) -> None:
+    def add_query(self, query: str, tool: str, parameters: Optional[Dict[str, Any]] = None, results: Optional[List[Dict[str, Any]]] = None,
+                  timestamp: Optional[int] = None) -> None:
         """
         Add a query to the current session.
         
@@ -238,12 +497,14 @@ class SessionManager:
             tool: Tool used for the query (e.g., "company_research", "judgment_research")
             parameters: Parameters used for the query
             results: Results of the query (optional)
+            timestamp: Time the query was made (defaults to now)
         """
         if not self.current_session_id:
             logger.error("No active session")
             return
         
-        timestamp = int(time.time())
+        if timestamp is None:
+            timestamp = int(time.time())
         
         query_record = {
             "query": query,
@@ -253,12 +514,26 @@ class SessionManager:
             "results": results or []
         }
         
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO queries (session_id, query, tool, ts, params_json, results_json) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.current_session_id, query, tool, timestamp,
+                     _dumps(query_record["parameters"]), _dumps(query_record["results"]))
+                )
+                self._index_text("query", query)
+                self._touch_session(timestamp)
+                self._mark_dirty()
+        except Exception as e:
+            logger.error(f"Error saving session {self.current_session_id}: {str(e)}")
+        
         self.current_session["queries"].append(query_record)
-        self._save_current_session()
+        self._count(self.current_session["_counters"]["tool_usage"], tool)
         
         logger.info(f"Added query to session: {query}")
     
-    def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+    def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None,
+                    timestamp: Optional[int] = None) -> None:
         """
         Add a message to the current session.
         
@@ -266,12 +541,14 @@ class SessionManager:
             role: Role of the message sender (e.g., "user", "assistant")
             content: Message content
             metadata: Additional metadata about the message
+            timestamp: Time the message was sent (defaults to now)
         """
         if not self.current_session_id:
             logger.error("No active session")
             return
         
-        timestamp = int(time.time())
+        if timestamp is None:
+            timestamp = int(time.time())
         
         message = {
             "role": role,
@@ -280,8 +557,20 @@ class SessionManager:
             "metadata": metadata or {}
         }
         
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO messages (session_id, role, content, ts, metadata_json) VALUES (?, ?, ?, ?, ?)",
+                    (self.current_session_id, role, content, timestamp, _dumps(message["metadata"]))
+                )
+                self._index_text("message", content, role)
+                self._touch_session(timestamp)
+                self._mark_dirty()
+        except Exception as e:
+            logger.error(f"Error saving session {self.current_session_id}: {str(e)}")
+        
         self.current_session["messages"].append(message)
-        self._save_current_session()
+        self._count(self.current_session["_counters"]["message_roles"], role)
         
         logger.debug(f"Added message to session: {role} ({len(content)} chars)")
     
@@ -329,9 +618,20 @@ class SessionManager:
         List all available sessions.
         
         Returns:
-            List of session metadata
+            List of session metadata, in the order the sessions were created
         """
-        return self.sessions_index["sessions"]
+        self.flush()
+        rows = self._conn.execute(
+            """
+            SELECT s.id, s.name, s.start_time, s.last_updated,
+                   (SELECT COUNT(*) FROM entities WHERE session_id = s.id) AS entity_count,
+                   (SELECT COUNT(*) FROM queries WHERE session_id = s.id) AS query_count,
+                   (SELECT COUNT(*) FROM messages WHERE session_id = s.id) AS message_count
+            FROM sessions s
+            ORDER BY s.rowid
+            """
+        )
+        return [dict(row) for row in rows]
     
     def delete_session(self, session_id: str) -> bool:
         """
@@ -343,22 +643,18 @@ class SessionManager:
         Returns:
             True if successful, False otherwise
         """
-        session_path = os.path.join(self.sessions_dir, f"{session_id}.json")
-        
-        if not os.path.exists(session_path):
-            logger.error(f"Session not found: {session_id}")
-            return False
-        
         try:
-            # Remove from file system
-            os.remove(session_path)
+            with self._lock:
+                self._last_updated.pop(session_id, None)
+                with self._conn:
+                    deleted = self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount
+                    for table in ("entities", "queries", "messages", "session_fts"):
+                        self._conn.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+                self.flush()
             
-            # Remove from index
-            self.sessions_index["sessions"] = [
-                session for session in self.sessions_index["sessions"] 
-                if session["id"] != session_id
-            ]
-            self._save_sessions_index()
+            if not deleted:
+                logger.error(f"Session not found: {session_id}")
+                return False
             
             # Reset current session if it was deleted
             if self.current_session_id == session_id:
@@ -379,6 +675,24 @@ class SessionManager:
             logger.error(f"Error deleting session {session_id}: {str(e)}")
             return False
     
+    def _count_by(self, table: str, column: str, session_id: str) -> Dict[str, int]:
+        """
+        Count a session's rows in a table grouped by one column.
+        
+        Args:
+            table: Table to count rows in
+            column: Column to group by
+            session_id: Session ID to count rows for
+            
+        Returns:
+            Mapping of column value to row count
+        """
+        rows = self._conn.execute(
+            f"SELECT {column}, COUNT(*) FROM {table} WHERE session_id = ? GROUP BY {column} ORDER BY MIN(rowid)",
+            (session_id,)
+        )
+        return {value: count for value, count in rows}
+    
     def summarize_session(self, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate a summary of a session.
@@ -395,58 +709,73 @@ class SessionManager:
             logger.error("No session to summarize")
             return {}
         
-        # Load the session if it's not the current one
-        session_data = self.current_session
-        if target_id != self.current_session_id:
-            session_path = os.path.join(self.sessions_dir, f"{target_id}.json")
-            
-            if not os.path.exists(session_path):
-                logger.error(f"Session not found: {target_id}")
-                return {}
+        if target_id == self.current_session_id:
+            # The current session keeps running counters, so no queries are needed
+            session_data = self.current_session
+            entities = session_data["entities"]
+            queries = session_data["queries"]
+            messages = session_data["messages"]
+            counters = session_data["_counters"]
             
+            name = session_data.get("name")
+            start_ts = session_data["start_time"]
+            last_ts = messages[-1]["timestamp"] if messages else None
+            entity_types = dict(counters["entity_types"])
+            tool_usage = dict(counters["tool_usage"])
+            message_roles = dict(counters["message_roles"])
+            entity_names = [e["name"] for e in entities]
+            last_queries = [q["query"] for q in queries[-5:]]
+        else:
             try:
-                with open(session_path, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
+                session_row = self._conn.execute(
+                    "SELECT name, start_time FROM sessions WHERE id = ?", (target_id,)
+                ).fetchone()
+                if session_row is None:
+                    logger.error(f"Session not found: {target_id}")
+                    return {}
+                
+                entity_types = self._count_by("entities", "type", target_id)
+                tool_usage = self._count_by("queries", "tool", target_id)
+                message_roles = self._count_by("messages", "role", target_id)
+                
+                last_message = self._conn.execute(
+                    "SELECT ts FROM messages WHERE session_id = ? ORDER BY ts DESC, rowid DESC LIMIT 1",
+                    (target_id,)
+                ).fetchone()
+                entity_names = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT name FROM entities WHERE session_id = ? ORDER BY rowid", (target_id,)
+                    )
+                ]
+                last_queries = [
+                    row[0] for row in self._conn.execute(
+                        "SELECT query FROM queries WHERE session_id = ? ORDER BY rowid DESC LIMIT 5", (target_id,)
+                    )
+                ][::-1]
             except Exception as e:
                 logger.error(f"Error loading session {target_id}: {str(e)}")
                 return {}
+            
+            name = session_row["name"]
+            start_ts = session_row["start_time"]
+            last_ts = last_message["ts"] if last_message else None
         
         # Generate summary
-        start_time = datetime.datetime.fromtimestamp(session_data["start_time"]).strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Entity counts by type
-        entity_types = {}
-        for entity in session_data["entities"]:
-            entity_type = entity["type"]
-            entity_types[entity_type] = entity_types.get(entity_type, 0) + 1
-        
-        # Tool usage counts
-        tool_usage = {}
-        for query in session_data["queries"]:
-            tool = query["tool"]
-            tool_usage[tool] = tool_usage.get(tool, 0) + 1
-        
-        # Message counts by role
-        message_roles = {}
-        for message in session_data["messages"]:
-            role = message["role"]
-            message_roles[role] = message_roles.get(role, 0) + 1
-        
-        # Summary
+        start_time = datetime.datetime.fromtimestamp(start_ts).strftime('%Y-%m-%d %H:%M:%S')
+        
         summary = {
             "id": target_id,
-            "name": session_data.get("name", "Unnamed Session"),
+            "name": name or "Unnamed Session",
             "start_time": start_time,
-            "duration": len(session_data["messages"]) > 0 and
-                      (session_data["messages"][-1]["timestamp"] - session_data["start_time"]) or 0,
-            "entity_count": len(session_data["entities"]),
+            "duration": last_ts - start_ts if last_ts is not None else 0,
+            "entity_count": sum(entity_types.values()),
             "entity_types": entity_types,
-            "query_count": len(session_data["queries"]),
+            "query_count": sum(tool_usage.values()),
             "tool_usage": tool_usage,
-            "message_count": len(session_data["messages"]),
+            "message_count": sum(message_roles.values()),
             "message_roles": message_roles,
-            "entities": [e["name"] for e in session_data["entities"]],
-            "last_queries": [q["query"] for q in session_data["queries"][-5:]] if session_data["queries"] else []
+            "entities": entity_names,
+            "last_queries": last_queries
         }
         
         return summary
@@ -455,63 +784,56 @@ class SessionManager:
         """
         Search for sessions containing a specific term.
         
+        The term is matched as a phrase against the full-text index, with
+        prefix matching on its last word.
+        
         Args:
             search_term: Term to search for
             
         Returns:
             List of matching session IDs and snippets
         """
-        results = []
-        search_term = search_term.lower()
+        search_term = search_term.strip()
+        if not search_term:
+            return []
         
-        for session_meta in self.sessions_index["sessions"]:
-            session_id = session_meta["id"]
-            session_path = os.path.join(self.sessions_dir, f"{session_id}.json")
-            
-            if not os.path.exists(session_path):
-                continue
+        match_query = '"' + search_term.replace('"', '""') + '"*'
+        results: Dict[str, Dict[str, Any]] = {}
+        
+        try:
+            rows = self._conn.execute(
+                """
+                SELECT f.session_id, s.name AS session_name, f.kind, f.role, f.content,
+                       snippet(session_fts, 0, '', '', '...', 16) AS snippet
+                FROM session_fts f JOIN sessions s ON s.id = f.session_id
+                WHERE session_fts MATCH ?
+                ORDER BY s.start_time, f.rowid
+                """,
+                (match_query,)
+            )
             
-            try:
-                with open(session_path, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                
-                # Search in entities
-                entity_matches = []
-                for entity in session_data["entities"]:
-                    if search_term in entity["name"].lower():
-                        entity_matches.append(entity["name"])
-                
-                # Search in queries
-                query_matches = []
-                for query in session_data["queries"]:
-                    if search_term in query["query"].lower():
-                        query_matches.append(query["query"])
-                
-                # Search in messages
-                message_matches = []
-                for message in session_data["messages"]:
-                    if search_term in message["content"].lower():
-                        # Extract a snippet around the match
-                        content = message["content"].lower()
-                        start_idx = max(0, content.find(search_term) - 50)
-                        end_idx = min(len(content), content.find(search_term) + len(search_term) + 50)
-                        snippet = "..." + message["content"][start_idx:end_idx] + "..."
-                        message_matches.append({
-                            "role": message["role"],
-                            "snippet": snippet
-                        })
+            for row in rows:
+                result = results.get(row["session_id"])
+                if result is None:
+                    result = results[row["session_id"]] = {
+                        "id": row["session_id"],
+                        "name": row["session_name"] or "Unnamed Session",
+                        "entity_matches": [],
+                        "query_matches": [],
+                        "message_matches": []
+                    }
                 
-                # If any matches, add to results
-                if entity_matches or query_matches or message_matches:
-                    results.append({
-                        "id": session_id,
-                        "name": session_data.get("name", "Unnamed Session"),
-                        "entity_matches": entity_matches,
-                        "query_matches": query_matches,
-                        "message_matches": message_matches[:3]  # Limit to 3 message matches
+                if row["kind"] == "entity":
+                    result["entity_matches"].append(row["content"])
+                elif row["kind"] == "query":
+                    result["query_matches"].append(row["content"])
+                elif len(result["message_matches"]) < 3:  # Limit to 3 message matches
+                    result["message_matches"].append({
+                        "role": row["role"],
+                        "snippet": row["snippet"]
                     })
-            
-            except Exception as e:
-                logger.error(f"Error searching session {session_id}: {str(e)}")
         
-        return results
\ No newline at end of file
+        except Exception as e:
+            logger.error(f"Error searching sessions: {str(e)}")
+        
+        return list(results.values())
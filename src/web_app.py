@@ -4,11 +4,12 @@ Streamlit web interface for the legal search agent.
 
 import os
 import streamlit as st
-import pandas as pd
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Dict, List, Any, Tuple
 import json
 import time
+import asyncio
 import datetime
+from functools import lru_cache
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,13 +20,15 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.config import Config
-from src.crawler import LegalCrawler
-from src.processor import DocumentProcessor
-from src.indexer import DocumentIndexer
-from src.search import LegalSearchEngine
-from src.langchain_integration import LegalLangChain
 from src.session_manager import SessionManager
 
+# The pipeline and LangChain modules pull in heavy dependencies, so they are
+# imported by the functions that use them rather than at startup
+if TYPE_CHECKING:
+    from src.search import LegalSearchEngine
+    from src.langchain_integration import LegalLangChain
+    from src.query_processor import QueryProcessor
+
 # Set page config
 st.set_page_config(
     page_title="Legal Search Agent",
@@ -38,9 +41,25 @@ st.set_page_config(
 VECTOR_STORE_DIR = "vector_stores"
 CONFIG_DIR = "configs"
 SESSIONS_DIR = "sessions"
+CHAT_HISTORY_RENDER_LIMIT = 20
+
+@st.cache_resource
+def get_session_manager(sessions_dir: str) -> SessionManager:
+    """
+    Get the session manager for a sessions directory, shared across reruns.
+    
+    Args:
+        sessions_dir: Directory for storing session data
+        
+    Returns:
+        Session manager for the directory
+    """
+    return SessionManager(sessions_dir=sessions_dir)
 
 # Initialize session manager
-session_manager = SessionManager(sessions_dir=SESSIONS_DIR)
+if "sessions_dir" in st.session_state:
+    SESSIONS_DIR = st.session_state.sessions_dir
+session_manager = get_session_manager(SESSIONS_DIR)
 
 # Initialize session state variables
 if "chat_history" not in st.session_state:
@@ -49,6 +68,12 @@ if "chat_history" not in st.session_state:
 if "current_sources" not in st.session_state:
     st.session_state.current_sources = []
 
+if "prefetched_search" not in st.session_state:
+    st.session_state.prefetched_search = {}
+
+if "legal_langchains" not in st.session_state:
+    st.session_state.legal_langchains = {}
+
 if "legal_session_id" not in st.session_state:
     # Create or load a session
     available_sessions = session_manager.list_sessions()
@@ -61,21 +86,41 @@ if "legal_session_id" not in st.session_state:
         # Create a new session
         session_id = session_manager.create_session("New Research Session")
         st.session_state.legal_session_id = session_id
+elif session_manager.get_session_id() != st.session_state.legal_session_id:
+    # The manager is shared by every browser session; switch it back to this one's
+    try:
+        session_manager.load_session(st.session_state.legal_session_id)
+    except FileNotFoundError:
+        st.session_state.legal_session_id = session_manager.create_session("New Research Session")
 
 # Functions
+@st.cache_data(ttl=30)
+def _scan_crawler_configs(config_dir: str, mtime: float) -> List[str]:
+    """
+    List configuration files in a directory.
+    
+    Args:
+        config_dir: Directory containing configuration files
+        mtime: Modification time of the directory, used as the cache key
+        
+    Returns:
+        List of configuration file names
+    """
+    with os.scandir(config_dir) as entries:
+        return [entry.name for entry in entries if entry.name.endswith('.json') and entry.is_file()]
+
 def load_crawler_configs() -> List[str]:
     """
     Load available crawler configurations.
     
+    The directory is only rescanned when its modification time changes.
+    
     Returns:
         List of configuration file names
     """
-    configs = []
-    if os.path.exists(CONFIG_DIR):
-        for file in os.listdir(CONFIG_DIR):
-            if file.endswith('.json'):
-                configs.append(file)
-    return configs
+    if not os.path.exists(CONFIG_DIR):
+        return []
+    return _scan_crawler_configs(CONFIG_DIR, os.path.getmtime(CONFIG_DIR))
 
 def run_crawler(config_file: str, output_dir: str) -> None:
     """
@@ -85,6 +130,8 @@ def run_crawler(config_file: str, output_dir: str) -> None:
         config_file: Path to configuration file
         output_dir: Output directory for downloaded documents
     """
+    from src.crawler import LegalCrawler
+    
     config_path = os.path.join(CONFIG_DIR, config_file)
     config = Config.from_file(config_path)
     crawler = LegalCrawler(config)
@@ -102,6 +149,8 @@ def process_documents(input_dir: str, output_dir: str) -> None:
         input_dir: Input directory with raw documents
         output_dir: Output directory for processed documents
     """
+    from src.processor import DocumentProcessor
+    
     processor = DocumentProcessor()
     
     with st.spinner(f"Processing documents from {input_dir}..."):
@@ -117,6 +166,8 @@ def index_documents(input_dir: str, output_dir: str) -> None:
         input_dir: Input directory with processed documents
         output_dir: Output directory for the index
     """
+    from src.indexer import DocumentIndexer
+    
     indexer = DocumentIndexer()
     
     with st.spinner(f"Indexing documents from {input_dir}..."):
@@ -124,7 +175,103 @@ def index_documents(input_dir: str, output_dir: str) -> None:
     
     st.success(f"Indexing completed. Index saved to {output_dir}")
 
-def search_documents(query: str, index_dir: str, k: int = 5) -> List[Dict[str, Any]]:
+def run_pipeline(config_file: str, raw_dir: str, processed_dir: str, index_dir: str) -> None:
+    """
+    Crawl, process and index documents in one run.
+    
+    Processing skips documents whose output is already up to date and the
+    indexer only embeds documents whose content changed, so each stage only
+    reads what the previous stage produced in this run.
+    
+    Args:
+        config_file: Crawler configuration file name
+        raw_dir: Directory for downloaded documents
+        processed_dir: Directory for processed documents
+        index_dir: Directory for the index
+    """
+    run_crawler(config_file, raw_dir)
+    process_documents(raw_dir, processed_dir)
+    index_documents(processed_dir, index_dir)
+
+@st.cache_data(persist="disk", max_entries=10000, show_spinner=False)
+def _persisted_query_embedding(model_name: str, query: str) -> List[float]:
+    """
+    Embed a query, keeping the result on disk across app restarts.
+    
+    Args:
+        model_name: Embedding model name, part of the cache key
+        query: Query text
+        
+    Returns:
+        Query embedding
+    """
+    from src.openai_clients import embed_query_uncached
+    
+    return embed_query_uncached(query)
+
+@st.cache_resource
+def _use_persisted_query_embeddings() -> None:
+    """Route query embeddings of the shared model through the disk cache."""
+    from src.openai_clients import get_embeddings, set_query_embedding_store
+    
+    model_name = get_embeddings().model
+    set_query_embedding_store(lambda query: _persisted_query_embedding(model_name, query))
+
+@st.cache_resource(max_entries=8)
+def get_search_engine(index_dir: str) -> "LegalSearchEngine":
+    """
+    Get a search engine for an index, shared across reruns.
+    
+    Args:
+        index_dir: Directory containing the index
+        
+    Returns:
+        Search engine for the index
+    """
+    from src.search import LegalSearchEngine
+    
+    _use_persisted_query_embeddings()
+    return LegalSearchEngine(index_dir)
+
+def get_legal_langchain(index_dir: str) -> "LegalLangChain":
+    """
+    Get the current browser session's LangChain integration for an index.
+    
+    Instances hold conversation memory, so each session keeps its own in
+    st.session_state; the models, vector store and answer cache they use
+    are shared by the LangChain module.
+    
+    Args:
+        index_dir: Directory containing the index
+        
+    Returns:
+        LangChain integration for the index
+    """
+    from src.langchain_integration import LegalLangChain
+    
+    instances = st.session_state.legal_langchains
+    if index_dir not in instances:
+        _use_persisted_query_embeddings()
+        instances[index_dir] = LegalLangChain(index_dir)
+    return instances[index_dir]
+
+@st.cache_resource(max_entries=8)
+def get_query_processor(index_dir: str) -> "QueryProcessor":
+    """
+    Get the query processor batching searches of an index across sessions.
+    
+    Args:
+        index_dir: Directory containing the index
+        
+    Returns:
+        Query processor for the index
+    """
+    from src.query_processor import QueryProcessor
+    
+    return QueryProcessor(get_search_engine(index_dir))
+
+def search_documents(query: str, index_dir: str, k: int = 5,
+                     entities: List[str] = None) -> List[Dict[str, Any]]:
     """
     Search for documents matching a query.
     
@@ -132,35 +279,76 @@ def search_documents(query: str, index_dir: str, k: int = 5) -> List[Dict[str, A
         query: Search query
         index_dir: Directory containing the index
         k: Number of results to return
+        entities: Only search documents mentioning one of these entity names
         
     Returns:
         List of search results
     """
-    search_engine = LegalSearchEngine(index_dir)
-    
-    with st.spinner(f"Searching for: {query}"):
-        results = search_engine.search(query, k=k)
+    # Reuse results fetched alongside an advanced query for the same search
+    prefetched = st.session_state.prefetched_search
+    if not entities and prefetched.get("key") == (index_dir, query, k):
+        results = prefetched["results"]
+    else:
+        query_processor = get_query_processor(index_dir)
+        
+        with st.spinner(f"Searching for: {query}"):
+            results = query_processor.submit(query, k=k, entities=entities)
     
     # Record the search in the session
-    session_manager.add_query(query, "basic_search", {"index": index_dir, "k": k})
+    params = {"index": index_dir, "k": k}
+    if entities:
+        params["entities"] = entities
+    session_manager.add_query(query, "basic_search", params)
     
     return results
 
-def langchain_query(query: str, index_dir: str) -> Dict[str, Any]:
+async def _query_and_prefetch_search(legal_langchain: "LegalLangChain", search_engine: "LegalSearchEngine",
+                                     query: str, k: int) -> List[Any]:
+    """
+    Run a LangChain query and a basic search for the same query concurrently.
+    
+    Args:
+        legal_langchain: LangChain integration to query
+        search_engine: Search engine to search
+        query: User query
+        k: Number of basic search results to fetch
+        
+    Returns:
+        LangChain response and basic search results (or the exception raised by the search)
+    """
+    return await asyncio.gather(
+        legal_langchain.aquery(query),
+        asyncio.to_thread(search_engine.search, query, k),
+        return_exceptions=True
+    )
+
+def langchain_query(query: str, index_dir: str, k: int = 5) -> Dict[str, Any]:
     """
     Query using LangChain.
     
+    The basic search results for the same query are fetched at the same
+    time, so switching the search type afterwards shows them immediately.
+    
     Args:
         query: User query
         index_dir: Directory containing the index
+        k: Number of basic search results to prefetch
         
     Returns:
         LangChain response
     """
-    legal_langchain = LegalLangChain(index_dir)
+    legal_langchain = get_legal_langchain(index_dir)
+    search_engine = get_search_engine(index_dir)
     
     with st.spinner(f"Processing query with LangChain: {query}"):
-        response = legal_langchain.query(query)
+        response, search_results = asyncio.run(
+            _query_and_prefetch_search(legal_langchain, search_engine, query, k)
+        )
+    
+    if isinstance(response, Exception):
+        raise response
+    if not isinstance(search_results, Exception):
+        st.session_state.prefetched_search = {"key": (index_dir, query, k), "results": search_results}
     
     # Record the query in the session
     session_manager.add_query(query, "langchain_query", {"index": index_dir})
@@ -169,7 +357,7 @@ def langchain_query(query: str, index_dir: str) -> Dict[str, Any]:
 
 def langchain_chat(query: str, index_dir: str) -> Dict[str, Any]:
     """
-    Chat using LangChain.
+    Chat using LangChain, streaming the answer into an assistant message.
     
     Args:
         query: User query
@@ -178,10 +366,16 @@ def langchain_chat(query: str, index_dir: str) -> Dict[str, Any]:
     Returns:
         LangChain response
     """
-    legal_langchain = LegalLangChain(index_dir)
+    legal_langchain = get_legal_langchain(index_dir)
     
-    with st.spinner(f"Processing chat with LangChain: {query}"):
-        response = legal_langchain.chat(query)
+    with st.chat_message("assistant"):
+        tokens, response_future = legal_langchain.chat_stream(query)
+        streamed_answer = st.write_stream(tokens)
+        response = response_future.result()
+        
+        # Errors are returned as an answer without any streamed tokens
+        if not streamed_answer:
+            st.write(response["answer"])
     
     # Add the query and response to chat history
     st.session_state.chat_history.append({"role": "user", "content": query})
@@ -191,9 +385,10 @@ def langchain_chat(query: str, index_dir: str) -> Dict[str, Any]:
     st.session_state.current_sources = response["sources"]
     
     # Record the chat in the session
-    session_manager.add_message("user", query)
-    session_manager.add_message("assistant", response["answer"])
-    session_manager.add_query(query, "langchain_chat", {"index": index_dir})
+    timestamp = int(time.time())
+    session_manager.add_message("user", query, timestamp=timestamp)
+    session_manager.add_message("assistant", response["answer"], timestamp=timestamp)
+    session_manager.add_query(query, "langchain_chat", {"index": index_dir}, timestamp=timestamp)
     
     return response
 
@@ -209,10 +404,87 @@ def add_entity_to_session(entity_type: str, entity_name: str, metadata: Dict[str
     session_manager.add_entity(entity_type, entity_name, metadata)
     st.success(f"Added {entity_type}: {entity_name} to the current session")
 
-def format_timestamp(timestamp):
+def format_timestamp(timestamp: float) -> str:
     """Format a timestamp as a human-readable date and time."""
-    dt = datetime.datetime.fromtimestamp(timestamp)
-    return dt.strftime('%Y-%m-%d %H:%M:%S')
+    # Sub-second parts are not displayed, so drop them to share cache entries
+    return _format_timestamp(int(timestamp))
+
+@lru_cache(maxsize=4096)
+def _format_timestamp(seconds: int) -> str:
+    """Format whole epoch seconds as a date and time string."""
+    return datetime.datetime.fromtimestamp(seconds).strftime('%Y-%m-%d %H:%M:%S')
+
+@st.cache_data(max_entries=32)
+def _entity_rows(session_id: str, entity_count: int) -> Dict[str, List[Any]]:
+    """
+    Build the entity table columns for the current session.
+    
+    Args:
+        session_id: Current session ID, used as the cache key
+        entity_count: Number of entities in the session, so new entities rebuild the table
+        
+    Returns:
+        Table columns
+    """
+    entities = session_manager.get_session_entities()
+    return {
+        "Type": [e["type"] for e in entities],
+        "Name": [e["name"] for e in entities],
+        "Added": [format_timestamp(e["timestamp"]) for e in entities]
+    }
+
+@st.cache_data(max_entries=32)
+def _query_rows(session_id: str, query_count: int) -> Dict[str, List[Any]]:
+    """
+    Build the query table columns for the current session.
+    
+    Args:
+        session_id: Current session ID, used as the cache key
+        query_count: Number of queries in the session, so new queries rebuild the table
+        
+    Returns:
+        Table columns
+    """
+    queries = session_manager.get_session_queries()
+    return {
+        "Query": [q["query"] for q in queries],
+        "Tool": [q["tool"] for q in queries],
+        "Time": [format_timestamp(q["timestamp"]) for q in queries]
+    }
+
+@st.cache_data(ttl=10, max_entries=8)
+def _session_index(session_keys: Tuple[Tuple[str, str, float], ...]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Build the session selector options and their lookup table.
+    
+    Args:
+        session_keys: (id, name, start_time) of each listed session, used as the cache key
+        
+    Returns:
+        Tuple of (selectbox options, display string to session ID)
+    """
+    display_to_id = {
+        f"{name} ({format_timestamp(start_time)})": session_id
+        for session_id, name, start_time in session_keys
+    }
+    return ["New Session"] + list(display_to_id), display_to_id
+
+def _switch_session(display_to_id: Dict[str, str]) -> None:
+    """
+    Load the session picked in the sidebar session selector.
+    
+    Args:
+        display_to_id: Selector option to session ID lookup
+    """
+    session_id = display_to_id.get(st.session_state.switch_session)
+    if session_id and session_id != st.session_state.legal_session_id:
+        session_manager.load_session(session_id)
+        st.session_state.legal_session_id = session_id
+
+def _create_session() -> None:
+    """Create a new session and make it the current one."""
+    new_name = f"Research Session {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}"
+    st.session_state.legal_session_id = session_manager.create_session(new_name)
 
 # UI components
 def render_sidebar() -> None:
@@ -243,25 +515,18 @@ def render_sidebar() -> None:
     
     # Session selection
     if sessions:
-        session_options = ["New Session"] + [f"{s.get('name', s['id'])} ({format_timestamp(s['start_time'])})" for s in sessions]
-        selected_session = st.sidebar.selectbox("Switch Session", session_options)
+        session_options, display_to_id = _session_index(
+            tuple((s["id"], s.get("name") or s["id"], s["start_time"]) for s in sessions)
+        )
+        # Switching and creating sessions happen in widget callbacks, which run
+        # before the rerun the widget triggers, so no second full rerun is needed
+        selected_session = st.sidebar.selectbox(
+            "Switch Session", session_options, key="switch_session",
+            on_change=_switch_session, args=(display_to_id,)
+        )
         
-        if selected_session != "New Session":
-            # Find the selected session
-            for session in sessions:
-                session_display = f"{session.get('name', session['id'])} ({format_timestamp(session['start_time'])})"
-                if selected_session == session_display and session["id"] != st.session_state.legal_session_id:
-                    # Load the selected session
-                    session_manager.load_session(session["id"])
-                    st.session_state.legal_session_id = session["id"]
-                    st.rerun()
-        elif selected_session == "New Session":
-            if st.sidebar.button("Create New Session"):
-                # Create a new session
-                new_name = f"Research Session {datetime.datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                session_id = session_manager.create_session(new_name)
-                st.session_state.legal_session_id = session_id
-                st.rerun()
+        if selected_session == "New Session":
+            st.sidebar.button("Create New Session", on_click=_create_session)
     
     # Navigation
     st.sidebar.header("Navigation")
@@ -296,23 +561,29 @@ def render_search_page() -> None:
         query = st.text_input("Search Query", placeholder="Enter your legal question...")
         num_results = st.slider("Number of Results", min_value=1, max_value=20, value=5)
         search_type = st.radio("Search Type", ["Basic", "Advanced (LangChain)"])
+        entity_filter = st.checkbox("Only search documents mentioning tracked entities (Basic)")
         submit_button = st.form_submit_button("Search")
     
     # Process search
     if submit_button and query:
         if search_type == "Basic":
-            results = search_documents(query, VECTOR_STORE_DIR, k=num_results)
+            entities = None
+            if entity_filter:
+                entities = sorted({e["name"] for e in session_manager.get_session_entities()})
+            results = search_documents(query, VECTOR_STORE_DIR, k=num_results, entities=entities)
             
-            # Display results
-            for i, result in enumerate(results):
-                with st.expander(f"Result {i+1}: {result['title']}"):
-                    st.write(f"**Source:** {result['source']}")
-                    st.write(f"**Relevance Score:** {result['score']:.2f}")
-                    st.write("**Content:**")
-                    st.write(result['content'])
+            # Display results as a single Markdown element rather than
+            # an expander with four elements per result
+            st.markdown("\n\n---\n\n".join(
+                f"#### Result {i+1}: {result['title']}\n\n"
+                f"**Source:** {result['source']}  \n"
+                f"**Relevance Score:** {result['score']:.2f}\n\n"
+                f"{result['content']}"
+                for i, result in enumerate(results)
+            ))
         
         else:  # Advanced (LangChain)
-            response = langchain_query(query, VECTOR_STORE_DIR)
+            response = langchain_query(query, VECTOR_STORE_DIR, k=num_results)
             
             # Display answer
             st.markdown("### Answer")
@@ -344,12 +615,31 @@ def render_chat_page() -> None:
             else:
                 st.warning("Please enter an entity name")
     
+    _chat_fragment()
+
+@st.fragment
+def _chat_fragment() -> None:
+    """
+    Render the chat history, input and sources.
+    
+    Runs as a fragment so a new chat message only reruns this part of the
+    page, not the sidebar and the entity tracker.
+    """
     # Chat container
     chat_container = st.container()
     
-    # Display chat history
+    # Display chat history; older messages are only rendered on request
+    chat_history = st.session_state.chat_history
+    earlier_messages = chat_history[:-CHAT_HISTORY_RENDER_LIMIT]
+    recent_messages = chat_history[-CHAT_HISTORY_RENDER_LIMIT:]
+    
     with chat_container:
-        for message in st.session_state.chat_history:
+        if earlier_messages and st.toggle(f"Show {len(earlier_messages)} earlier messages"):
+            for message in earlier_messages:
+                with st.chat_message(message["role"]):
+                    st.write(message["content"])
+        
+        for message in recent_messages:
             with st.chat_message(message["role"]):
                 st.write(message["content"])
     
@@ -361,11 +651,8 @@ def render_chat_page() -> None:
         with st.chat_message("user"):
             st.write(user_query)
         
-        # Get response from LangChain
-        response = langchain_chat(user_query, VECTOR_STORE_DIR)
-        
-        with st.chat_message("assistant"):
-            st.write(response["answer"])
+        # Get the response from LangChain as it is generated
+        langchain_chat(user_query, VECTOR_STORE_DIR)
     
     # Sources
     if st.session_state.current_sources:
@@ -380,15 +667,32 @@ def render_data_collection_page() -> None:
     st.title("Data Collection")
     st.write("Collect and process legal data from various sources.")
     
+    # Configurations are needed by both the pipeline and the crawler tab
+    configs = load_crawler_configs()
+    
     # Tabs for different data collection steps
-    tab1, tab2, tab3 = st.tabs(["Crawl", "Process", "Index"])
+    pipeline_tab, tab1, tab2, tab3 = st.tabs(["Full Pipeline", "Crawl", "Process", "Index"])
+    
+    with pipeline_tab:
+        st.header("Full Pipeline")
+        st.write("Crawl, process and index new documents in one run.")
+        
+        if configs:
+            config_file = st.selectbox("Select Configuration", configs, key="pipeline_config")
+            raw_dir = st.text_input("Download Directory", "downloaded_docs", key="pipeline_raw")
+            processed_dir = st.text_input("Processed Directory", "processed_docs", key="pipeline_processed")
+            index_dir = st.text_input("Index Directory", VECTOR_STORE_DIR, key="pipeline_index")
+            
+            if st.button("Run Full Pipeline"):
+                run_pipeline(config_file, raw_dir, processed_dir, index_dir)
+        else:
+            st.warning("No crawler configurations found. Please add a configuration file to the configs directory.")
     
     with tab1:
         st.header("Web Crawler")
         st.write("Crawl legal websites to collect documents.")
         
         # Config selection
-        configs = load_crawler_configs()
         if configs:
             config_file = st.selectbox("Select Configuration", configs)
             output_dir = st.text_input("Output Directory", "downloaded_docs")
@@ -437,28 +741,14 @@ def render_session_history_page() -> None:
     tab1, tab2, tab3 = st.tabs(["Entities", "Queries", "Messages"])
     
     with tab1:
-        entities = session_manager.get_session_entities()
-        if entities:
-            df = pd.DataFrame([{
-                "Type": e["type"],
-                "Name": e["name"],
-                "Added": format_timestamp(e["timestamp"])
-            } for e in entities])
-            
-            st.dataframe(df)
+        if summary.get("entity_count"):
+            st.dataframe(_entity_rows(current_session, summary["entity_count"]))
         else:
             st.info("No entities tracked in this session yet.")
     
     with tab2:
-        queries = session_manager.get_session_queries()
-        if queries:
-            df = pd.DataFrame([{
-                "Query": q["query"],
-                "Tool": q["tool"],
-                "Time": format_timestamp(q["timestamp"])
-            } for q in queries])
-            
-            st.dataframe(df)
+        if summary.get("query_count"):
+            st.dataframe(_query_rows(current_session, summary["query_count"]))
         else:
             st.info("No queries performed in this session yet.")
     
@@ -476,16 +766,15 @@ def render_session_history_page() -> None:
     all_sessions = session_manager.list_sessions()
     
     if all_sessions:
-        df = pd.DataFrame([{
-            "Name": s.get("name", "Unnamed"),
-            "Started": format_timestamp(s["start_time"]),
-            "Entities": s.get("entity_count", 0),
-            "Queries": s.get("query_count", 0),
-            "Messages": s.get("message_count", 0),
-            "ID": s["id"]
-        } for s in all_sessions])
-        
-        st.dataframe(df)
+        # Build the table column by column rather than as one dict per row
+        st.dataframe({
+            "Name": [s.get("name", "Unnamed") for s in all_sessions],
+            "Started": [format_timestamp(s["start_time"]) for s in all_sessions],
+            "Entities": [s.get("entity_count", 0) for s in all_sessions],
+            "Queries": [s.get("query_count", 0) for s in all_sessions],
+            "Messages": [s.get("message_count", 0) for s in all_sessions],
+            "ID": [s["id"] for s in all_sessions]
+        })
         
         # Session search
         st.subheader("Search Sessions")
@@ -520,6 +809,8 @@ def render_session_history_page() -> None:
 
 def render_settings_page() -> None:
     """Render the settings page."""
+    global VECTOR_STORE_DIR, SESSIONS_DIR, session_manager
+    
     st.title("Settings")
     st.write("Configure the legal search agent.")
     
@@ -536,7 +827,6 @@ def render_settings_page() -> None:
     vector_store_dir = st.text_input("Vector Store Directory", VECTOR_STORE_DIR)
     
     if st.button("Save Vector Store Settings"):
-        global VECTOR_STORE_DIR
         VECTOR_STORE_DIR = vector_store_dir
         st.success("Vector store settings saved")
     
@@ -545,17 +835,25 @@ def render_settings_page() -> None:
     sessions_dir = st.text_input("Sessions Directory", SESSIONS_DIR)
     
     if st.button("Save Session Settings"):
-        global SESSIONS_DIR
-        SESSIONS_DIR = sessions_dir
-        # Reinitialize session manager with new directory
-        global session_manager
-        session_manager = SessionManager(sessions_dir=SESSIONS_DIR)
+        if sessions_dir != SESSIONS_DIR:
+            # Close the old directory's manager and evict it from the cache
+            old_manager = session_manager
+            get_session_manager.clear()
+            old_manager.close()
+            
+            SESSIONS_DIR = st.session_state.sessions_dir = sessions_dir
+            session_manager = get_session_manager(SESSIONS_DIR)
+            
+            # Pick a session from the new directory on the next rerun
+            del st.session_state.legal_session_id
         st.success("Session settings saved")
     
     # Reset Chat History
     st.header("Chat")
     if st.button("Clear Chat History"):
         st.session_state.chat_history = []
+        for legal_langchain in st.session_state.legal_langchains.values():
+            legal_langchain.reset_conversation()
         st.success("Chat history cleared")
 
 def render_about_page() -> None:
@@ -0,0 +1,21 @@
+"""
+Shared pytest fixtures.
+"""
+
+import logging
+from unittest.mock import MagicMock
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def _logger_template():
+    """Logger mock built once per test session."""
+    return MagicMock(spec=logging.Logger)
+
+
+@pytest.fixture
+def mock_logger(_logger_template):
+    """Logger mock with no recorded calls."""
+    _logger_template.reset_mock()
+    return _logger_template
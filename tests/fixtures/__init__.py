@@ -0,0 +1,3 @@
+"""
+Sample documents used by the tests.
+"""
@@ -0,0 +1,104 @@
+"""
+Unit tests for crawling with the Firecrawl integration.
+"""
+
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.error_handler import APIError
+from src import firecrawl_integration
+from src.firecrawl_integration import FirecrawlClient, get_default_client
+
+URL = "https://courts.example/opinions"
+
+
+@pytest.fixture
+def client():
+    """Firecrawl client whose SDK starts crawl job 'job-1'."""
+    client = FirecrawlClient.__new__(FirecrawlClient)
+    client.api_key = "test-key"
+    client.client = MagicMock()
+    client.client.crawl_url.return_value = {"success": True, "id": "job-1"}
+    return client
+
+
+@pytest.fixture(autouse=True)
+def no_sleep():
+    """Skip the delays between status polls."""
+    with patch("src.firecrawl_integration.time.sleep"):
+        yield
+
+
+def _statuses(*statuses):
+    """Stub check_crawl_status to return the given statuses in order."""
+    return patch.object(FirecrawlClient, "check_crawl_status", side_effect=list(statuses))
+
+
+def test_crawl_url_iter_yields_incrementally(client):
+    """Test that pages are yielded as each poll returns them."""
+    with _statuses(
+        {"status": "scraping", "data": [{"url": "a"}]},
+        {"status": "scraping", "data": [{"url": "a"}, {"url": "b"}]},
+        {"status": "completed", "data": [{"url": "a"}, {"url": "b"}, {"url": "c"}]},
+    ) as check_crawl_status:
+        pages = client.crawl_url_iter(URL)
+        
+        assert next(pages) == {"url": "a"}
+        assert check_crawl_status.call_count == 1
+        assert next(pages) == {"url": "b"}
+        assert check_crawl_status.call_count == 2
+        assert list(pages) == [{"url": "c"}]
+        assert check_crawl_status.call_count == 3
+    
+    check_crawl_status.assert_called_with("job-1")
+    assert client.client.crawl_url.call_args.kwargs["wait_until_done"] is False
+
+
+@pytest.mark.parametrize("state", ["failed", "cancelled"])
+def test_crawl_url_iter_stops_on_failure(client, state):
+    """Test that a failed or cancelled job ends the crawl after its pages."""
+    with _statuses(
+        {"status": "scraping", "data": [{"url": "a"}]},
+        {"status": state, "data": [{"url": "a"}, {"url": "b"}]},
+        {"status": "scraping", "data": []},
+    ) as check_crawl_status:
+        pages = []
+        with pytest.raises(APIError, match=state):
+            for page in client.crawl_url_iter(URL):
+                pages.append(page)
+    
+    assert pages == [{"url": "a"}, {"url": "b"}]
+    assert check_crawl_status.call_count == 2
+
+
+def test_crawl_url_collects_pages(client):
+    """Test that crawl_url waits for the job and returns every page."""
+    with _statuses(
+        {"status": "scraping", "data": [{"url": "a"}]},
+        {"status": "completed", "data": [{"url": "a"}, {"url": "b"}]},
+    ):
+        response = client.crawl_url(URL)
+    
+    assert response["status"] == "completed"
+    assert response["data"] == [{"url": "a"}, {"url": "b"}]
+
+
+def test_crawl_url_without_waiting(client):
+    """Test that crawl_url returns the job when not waiting for completion."""
+    with _statuses() as check_crawl_status:
+        response = client.crawl_url(URL, wait_for_completion=False)
+    
+    assert response["id"] == "job-1"
+    check_crawl_status.assert_not_called()
+
+
+def test_get_default_client_is_shared_per_key():
+    """Test that callers with the same API key share one client."""
+    with patch.dict(firecrawl_integration._CLIENTS, clear=True), \
+            patch.object(firecrawl_integration, "FirecrawlClient", side_effect=lambda api_key: MagicMock()) as factory:
+        assert get_default_client() is get_default_client()
+        assert get_default_client("other-key") is get_default_client("other-key")
+        assert get_default_client("other-key") is not get_default_client()
+    
+    assert [c.kwargs for c in factory.call_args_list] == [{"api_key": None}, {"api_key": "other-key"}]
@@ -0,0 +1,78 @@
+"""
+Unit tests for the semantic answer cache of the LangChain integration.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("chromadb")
+
+from src.indexer import DocumentIndexer
+from src.langchain_integration import LegalLangChain, _SemanticCache, _answer_cache
+
+
+def _unit(*values):
+    """Normalized query vector."""
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+@pytest.fixture
+def cache():
+    """Semantic cache with the LegalLangChain threshold."""
+    return _SemanticCache(LegalLangChain.SEMANTIC_CACHE_THRESHOLD, size=2)
+
+
+def test_cache_hit(cache):
+    """Test that a similar query is answered with a copy of the cached result."""
+    result = {"answer": "Yes.", "sources": [{"source": "opinion.txt"}]}
+    cache.store(_unit(1.0, 0.0), result)
+    
+    # Changing the stored or returned result doesn't change the cache
+    result["sources"].append({"source": "added.txt"})
+    hit = cache.lookup(_unit(1.0, 0.01))
+    assert hit == {"answer": "Yes.", "sources": [{"source": "opinion.txt"}]}
+    
+    hit["sources"].clear()
+    assert cache.lookup(_unit(1.0, 0.0))["sources"] == [{"source": "opinion.txt"}]
+
+
+def test_cache_miss_below_threshold(cache):
+    """Test that a dissimilar query misses the cache."""
+    assert cache.lookup(_unit(1.0, 0.0)) is None
+    
+    cache.store(_unit(1.0, 0.0), {"answer": "Yes.", "sources": []})
+    
+    assert cache.lookup(_unit(1.0, 1.0)) is None
+    assert cache.lookup(_unit(0.0, 1.0)) is None
+
+
+def test_cache_eviction(cache):
+    """Test that the least recently used answer is evicted."""
+    cache.store(_unit(1.0, 0.0, 0.0), {"answer": "first"})
+    cache.store(_unit(0.0, 1.0, 0.0), {"answer": "second"})
+    cache.lookup(_unit(1.0, 0.0, 0.0))
+    cache.store(_unit(0.0, 0.0, 1.0), {"answer": "third"})
+    
+    assert cache.lookup(_unit(1.0, 0.0, 0.0)) == {"answer": "first"}
+    assert cache.lookup(_unit(0.0, 1.0, 0.0)) is None
+
+
+def test_cache_invalidated_by_reindex(tmp_path):
+    """Test that answers from before a re-index are not served."""
+    index_dir = str(tmp_path)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    DocumentIndexer._save_manifest(index_dir, {"opinion.json": "0" * 64})
+    os.utime(manifest_path, ns=(10 ** 9, 10 ** 9))
+    
+    cache = _answer_cache(index_dir, "gpt-3.5-turbo")
+    cache.store(_unit(1.0, 0.0), {"answer": "Old index.", "sources": []})
+    assert _answer_cache(index_dir, "gpt-3.5-turbo") is cache
+    
+    # index_directory rewrites the manifest at the end of every run
+    DocumentIndexer._save_manifest(index_dir, {"opinion.json": "1" * 64})
+    
+    assert _answer_cache(index_dir, "gpt-3.5-turbo").lookup(_unit(1.0, 0.0)) is None
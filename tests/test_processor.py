@@ -0,0 +1,38 @@
+"""
+Unit tests for the document processor module.
+"""
+
+import importlib.resources
+
+import pytest
+
+from src.processor import DocumentProcessor
+
+
+@pytest.fixture
+def sample_opinion():
+    """Text of the sample opinion fixture."""
+    return importlib.resources.files("tests.fixtures").joinpath("sample_opinion.txt").read_text()
+
+
+def test_analyze_content_matches_extractors(sample_opinion):
+    """Test that the single-pass analysis agrees with the separate extractors."""
+    processor = DocumentProcessor()
+    
+    title, sections, entities = processor._analyze_content(sample_opinion, "sample_opinion.txt")
+    
+    assert title == processor.extract_title(sample_opinion, "sample_opinion.txt") == "SUPREME COURT OF THE UNITED STATES"
+    assert sections == processor.extract_sections(sample_opinion)
+    assert [section['heading'] for section in sections] == ["SUPREME COURT OF THE UNITED STATES", "SAMPLE OPINION"]
+    assert entities == processor.extract_entities(sample_opinion)
+
+
+@pytest.mark.parametrize("content", ["", " \n\t\n", "\n\n  Title line  \nMORE\nbody"])
+def test_analyze_content_edge_cases(content):
+    """Test the title fallback and leading blank lines."""
+    processor = DocumentProcessor()
+    
+    title, sections, _ = processor._analyze_content(content, "/docs/fallback.txt")
+    
+    assert title == processor.extract_title(content, "/docs/fallback.txt")
+    assert sections == processor.extract_sections(content)
@@ -0,0 +1,63 @@
+"""
+Unit tests for query batching and the query embedding cache.
+"""
+
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_openai")
+
+from src import openai_clients
+from src.search import LegalSearchEngine
+from src.query_processor import QueryProcessor
+
+
+@pytest.fixture
+def embed_documents(monkeypatch):
+    """Embedding API calls of the shared model, with an empty query cache."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    openai_clients._embed_query.cache_clear()
+    
+    def embed(texts):
+        return [[float(len(text)), 1.0] for text in texts]
+    
+    with patch.object(type(openai_clients.get_embeddings()), "embed_documents", side_effect=embed) as mock:
+        yield mock
+    
+    openai_clients._embed_query.cache_clear()
+
+
+@pytest.fixture
+def search_engine(tmp_path):
+    """Search engine whose vector store lookups return no documents."""
+    engine = LegalSearchEngine(str(tmp_path))
+    engine._retrieve = MagicMock(return_value=[])
+    return engine
+
+
+def test_embed_queries_reuses_cache(embed_documents):
+    """Test that only queries missing from the cache are sent to the API."""
+    first = openai_clients.embed_queries(["breach of contract"])
+    embeddings = openai_clients.embed_queries(["breach of contract", "adverse possession", "breach of contract"])
+    
+    # Repeats are served from the cache, whether batched or queried singly
+    assert openai_clients.get_embeddings().embed_query("adverse possession") == [18.0, 1.0]
+    assert [c.args for c in embed_documents.call_args_list] == [(["breach of contract"],), (["adverse possession"],)]
+    assert embeddings == [first[0], [18.0, 1.0], first[0]]
+
+
+def test_repeated_query_is_embedded_once(embed_documents, search_engine):
+    """Test that a repeated query is answered from the embedding cache without waiting for a batch."""
+    processor = QueryProcessor(search_engine, max_wait_ms=60000)
+    
+    started = time.monotonic()
+    assert processor.submit("statute of limitations") == []
+    assert processor.submit("statute of limitations") == []
+    
+    # A lone query does not wait max_wait_ms for a batch to fill
+    assert time.monotonic() - started < 5
+    embed_documents.assert_called_once_with(["statute of limitations"])
+    assert search_engine._retrieve.call_count == 2
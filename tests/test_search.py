@@ -1,10 +1,20 @@
 """
-Test script for the legal search agent.
+End-to-end tests for the legal search agent.
+
+The crawl, process and index stages each run once per test session; the
+search tests share the resulting index. The crawl runs against fake sites,
+so no network access is needed.
 """
 
 import os
 import sys
-import time
+import html
+import threading
+import importlib.resources
+from unittest.mock import patch
+
+import pytest
+import requests
 from dotenv import load_dotenv
 
 # Add the parent directory to the path
@@ -13,172 +23,187 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.config import Config
 from src.crawler import LegalCrawler
 from src.processor import DocumentProcessor
-from src.indexer import DocumentIndexer
-from src.search import LegalSearchEngine
-from src.langchain_integration import LegalLangChain
 
-def run_test():
-    """Run a test of the legal search agent."""
-    print("Starting Legal Search Agent test...")
-    
-    # Set up directories
-    test_dirs = ["test_downloaded", "test_processed", "test_indexed"]
-    for directory in test_dirs:
-        os.makedirs(directory, exist_ok=True)
-    
-    # Step 1: Crawl
-    print("\n--- Step 1: Crawling ---")
-    config = Config.from_file("configs/test_config.json")
-    crawler = LegalCrawler(config)
-    
-    print("Crawling legal websites...")
-    crawler.crawl(output_dir=test_dirs[0])
-    print(f"Crawling complete. Documents saved to {test_dirs[0]}")
-    
-    # Check if documents were downloaded
-    downloaded_files = []
-    for root, _, files in os.walk(test_dirs[0]):
-        for file in files:
-            if not file.endswith('.meta.json'):
-                downloaded_files.append(os.path.join(root, file))
-    
-    print(f"Downloaded {len(downloaded_files)} documents")
-    
-    # If no documents were downloaded, use a sample
-    if not downloaded_files:
-        print("No documents downloaded, creating a sample document for testing...")
-        sample_dir = os.path.join(test_dirs[0], "sample")
-        os.makedirs(sample_dir, exist_ok=True)
-        
-        sample_content = """
-        SUPREME COURT OF THE UNITED STATES
-        
-        SAMPLE OPINION
-        
-        CASE NO. 123-456
-        
-        In the matter of Legal Search Agent Testing
-        
-        Delivered by Chief Justice TEST
-        
-        Opinion of the Court:
-        
-        This is a sample legal opinion created for testing purposes. The question before this court
-        is whether automated legal research tools can effectively crawl, process, and retrieve
-        legal information.
-        
-        The court finds that modern technology, when properly implemented, can significantly
-        enhance legal research capabilities. However, human review and judgment remain essential
-        components of thorough legal research.
-        
-        In prior cases such as Technology v. Traditional Methods (2022), we established that
-        digital tools serve as a supplement to, not a replacement for, trained legal professionals.
-        
-        The court hereby rules that the Legal Search Agent, as demonstrated, shows promising
-        capabilities for assisting in legal research tasks.
-        
-        So ordered.
-        """
-        
-        with open(os.path.join(sample_dir, "sample_opinion.txt"), "w") as f:
-            f.write(sample_content)
-        
-        # Add a metadata file
-        sample_metadata = """{
-            "url": "https://example.com/sample/opinion",
-            "timestamp": 1714945995.0,
-            "headers": {"User-Agent": "LegalSearchAgent/1.0 (Test Run)"},
-            "file_path": "test_downloaded/sample/sample_opinion.txt"
-        }"""
-        
-        with open(os.path.join(sample_dir, "sample_opinion.txt.meta.json"), "w") as f:
-            f.write(sample_metadata)
-        
-        downloaded_files = [os.path.join(sample_dir, "sample_opinion.txt")]
-    
-    # Step 2: Process
-    print("\n--- Step 2: Processing ---")
-    processor = DocumentProcessor()
-    
-    print("Processing documents...")
-    processor.process_directory(test_dirs[0], test_dirs[1])
-    print(f"Processing complete. Processed documents saved to {test_dirs[1]}")
+# Load environment variables, so OPENAI_API_KEY may come from .env
+load_dotenv()
+
+requires_openai = pytest.mark.skipif(not os.getenv("OPENAI_API_KEY"), reason="needs OPENAI_API_KEY")
+
+# Crawl configuration for the fake sites served by FakeWeb
+CRAWL_CONFIG = {
+    "user_agent": "LegalSearchAgent/1.0 (Test Run)",
+    "request_delay": 0.5,
+    "max_pages": 10,
+    "max_depth": 2,
+    "document_types": ["html", "pdf"],
+    "sources": [
+        {
+            "name": "opinions",
+            "url": "https://opinions.example/recent",
+            "selectors": {"content": "div.opinion", "links": "a.opinion-link"}
+        },
+        {
+            "name": "statutes",
+            "url": "https://statutes.example/title-1",
+            "selectors": {"content": "div.opinion", "links": "a.opinion-link"}
+        }
+    ]
+}
+
+STATUTE_TEXT = "Section 1. Automated research tools may be used to assist counsel."
+
+
+def _sample_opinion():
+    """Read the sample opinion fixture."""
+    return importlib.resources.files("tests.fixtures").joinpath("sample_opinion.txt").read_text()
+
+
+class FakeResponse:
+    """Minimal stand-in for the streamed requests.Response the crawler reads."""
     
-    # Check if documents were processed
-    processed_files = []
-    for root, _, files in os.walk(test_dirs[1]):
-        for file in files:
-            processed_files.append(os.path.join(root, file))
+    def __init__(self, url, body):
+        self.url = url
+        self.status_code = 200 if body is not None else 404
+        self.headers = {"Content-Type": "text/html; charset=utf-8"}
+        self._body = (body or "").encode("utf-8")
     
-    print(f"Processed {len(processed_files)} documents")
+    def raise_for_status(self):
+        if self.status_code != 200:
+            raise requests.HTTPError(f"{self.status_code} for {self.url}", response=self)
     
-    # Step 3: Index
-    print("\n--- Step 3: Indexing ---")
+    def iter_content(self, chunk_size=1):
+        yield self._body
+
+
+class FakeWeb:
+    """Serves fixed pages in place of requests.Session.get and records each request."""
+    
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+        self._lock = threading.Lock()
+    
+    def get(self, session, url, **kwargs):
+        with self._lock:
+            self.requested.append(url)
+        return FakeResponse(url, self.pages.get(url))
+
+
+def _iter_files(root, skip_metadata=False):
+    """Recursively yield the paths of files under a directory."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_files(entry.path, skip_metadata)
+            elif not (skip_metadata and entry.name.endswith('.meta.json')):
+                yield entry.path
+
+
+@pytest.fixture(scope="session")
+def fake_web():
+    """Pages of two fake legal sites, one linking to the sample opinion."""
+    return FakeWeb({
+        "https://opinions.example/recent": (
+            '<html><body><a class="opinion-link" href="/opinions/123-456">Opinion 123-456</a>'
+            '<a href="/about">About</a></body></html>'
+        ),
+        "https://opinions.example/opinions/123-456": (
+            f'<html><body><div class="opinion">{html.escape(_sample_opinion())}</div></body></html>'
+        ),
+        "https://statutes.example/title-1": (
+            f'<html><body><div class="opinion">{STATUTE_TEXT}</div></body></html>'
+        ),
+    })
+
+
+@pytest.fixture(scope="session")
+def crawler(fake_web, tmp_path_factory):
+    """Crawl the fake sites once, with HTTP requests answered by fake_web."""
+    crawler = LegalCrawler(Config(CRAWL_CONFIG))
+    crawler.output_dir = str(tmp_path_factory.mktemp("downloaded"))
     
-    try:
-        indexer = DocumentIndexer()
-        
-        print("Indexing documents...")
-        indexer.index_directory(test_dirs[1], test_dirs[2])
-        print(f"Indexing complete. Index saved to {test_dirs[2]}")
-        
-        # Step 4: Search
-        print("\n--- Step 4: Basic Search ---")
-        search_engine = LegalSearchEngine(test_dirs[2])
-        
-        test_query = "legal technology effectiveness"
-        print(f"Searching for: '{test_query}'")
-        results = search_engine.search(test_query, k=3)
-        
-        print(f"Found {len(results)} results")
-        for i, result in enumerate(results):
-            print(f"\nResult {i+1}:")
-            print(f"Source: {result['source']}")
-            print(f"Relevance: {result['score']:.2f}")
-            print(f"Content preview: {result['content'][:200]}...")
-        
-        # Step 5: LangChain Search (if OpenAI API key is available)
-        print("\n--- Step 5: LangChain Search ---")
-        
-        if os.getenv("OPENAI_API_KEY"):
-            try:
-                legal_langchain = LegalLangChain(test_dirs[2])
-                
-                langchain_query = "How does the court view the role of technology in legal research?"
-                print(f"LangChain query: '{langchain_query}'")
-                
-                response = legal_langchain.query(langchain_query)
-                
-                print("\nLangChain Answer:")
-                print(response["answer"])
-                print("\nSources:")
-                for i, source in enumerate(response["sources"]):
-                    print(f"Source {i+1}: {source.get('title', 'Unknown')}")
-            except Exception as e:
-                print(f"Error during LangChain search: {str(e)}")
-                print("This test requires a valid OpenAI API key to be set in the .env file.")
-        else:
-            print("Skipping LangChain search - no OpenAI API key available.")
-            print("Set OPENAI_API_KEY in your .env file to enable this test.")
+    with patch.object(requests.Session, "get", autospec=True, side_effect=fake_web.get):
+        crawler.crawl(output_dir=crawler.output_dir)
     
-    except Exception as e:
-        print(f"Error during indexing/search: {str(e)}")
+    return crawler
+
+
+@pytest.fixture(scope="session")
+def downloaded_dir(crawler):
+    """Directory of the documents downloaded by the crawl."""
+    return crawler.output_dir
+
+
+@pytest.fixture(scope="session")
+def processed_dir(downloaded_dir, tmp_path_factory):
+    """Process the downloaded documents once."""
+    directory = str(tmp_path_factory.mktemp("processed"))
+    DocumentProcessor().process_directory(downloaded_dir, directory)
+    return directory
+
+
+@pytest.fixture(scope="session")
+def index_dir(processed_dir, tmp_path_factory):
+    """Index the processed documents once."""
+    if not os.getenv("OPENAI_API_KEY"):
+        pytest.skip("needs OPENAI_API_KEY")
+    pytest.importorskip("chromadb")
+    from src.indexer import DocumentIndexer
+    
+    directory = str(tmp_path_factory.mktemp("indexed"))
+    DocumentIndexer().index_directory(processed_dir, directory)
+    return directory
+
+
+def test_crawl(crawler, fake_web, downloaded_dir):
+    """Test that crawling follows selected links and saves page content."""
+    # The /about link doesn't match the link selector, so it isn't followed
+    assert sorted(fake_web.requested) == [
+        "https://opinions.example/opinions/123-456",
+        "https://opinions.example/recent",
+        "https://statutes.example/title-1",
+    ]
+    
+    # Only pages with content matching the content selector are saved
+    assert crawler.document_count == 2
+    contents = []
+    for path in _iter_files(downloaded_dir, skip_metadata=True):
+        with open(path, encoding="utf-8") as f:
+            contents.append(f.read())
+    assert len(contents) == 2
+    assert any("SAMPLE OPINION" in content for content in contents)
+    assert STATUTE_TEXT in contents
+
+
+def test_process(processed_dir):
+    """Test that processing writes processed documents."""
+    assert next(_iter_files(processed_dir), None) is not None
+
+
+def test_index(index_dir):
+    """Test that indexing writes an index."""
+    assert os.listdir(index_dir)
+
+
+def test_search(index_dir):
+    """Test a basic search of the index."""
+    from src.search import LegalSearchEngine
     
-    print("\nTest completed!")
+    results = LegalSearchEngine(index_dir).search("legal technology effectiveness", k=3)
     
-    # Cleanup
-    print("\nTest directories:")
-    for directory in test_dirs:
-        print(f"- {os.path.abspath(directory)}")
+    assert 0 < len(results) <= 3
+    for result in results:
+        assert {"source", "score", "content"} <= result.keys()
+
+
+@requires_openai
+def test_langchain_search(index_dir):
+    """Test a LangChain query of the index."""
+    from src.langchain_integration import LegalLangChain
     
-    print("\nYou can now run more specific searches on the indexed data:")
-    print(f"python main.py search --query \"your search query\" --index {test_dirs[2]}")
-    print("or")
-    print(f"python main.py search --query \"your search query\" --index {test_dirs[2]} --type langchain")
-
-if __name__ == "__main__":
-    # Load environment variables
-    load_dotenv()
+    response = LegalLangChain(index_dir).query(
+        "How does the court view the role of technology in legal research?"
+    )
     
-    # Run the test
-    run_test()
\ No newline at end of file
+    assert response["answer"]
+    assert "sources" in response
@@ -0,0 +1,219 @@
+"""
+Unit tests for the session manager module.
+"""
+
+import os
+import json
+import time
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src.session_manager import SessionManager, SESSIONS_DB_FILENAME
+
+
+@pytest.fixture
+def sessions_dir(tmp_path):
+    """Directory for the session database."""
+    return str(tmp_path / "sessions")
+
+
+@pytest.fixture
+def manager(sessions_dir):
+    """Session manager that only commits appends on flush()."""
+    manager = SessionManager(sessions_dir, flush_interval_ms=60000, flush_every_n=1000)
+    yield manager
+    manager.close()
+
+
+def _committed_count(sessions_dir, table):
+    """Count the committed rows of a table, as seen by another connection."""
+    conn = sqlite3.connect(os.path.join(sessions_dir, SESSIONS_DB_FILENAME))
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_create_session(manager):
+    """Test that sessions created in the same second get distinct IDs."""
+    with patch("src.session_manager.time.time", return_value=1700000000):
+        first = manager.create_session("First")
+        second = manager.create_session("Second")
+    
+    assert first == "session_1700000000"
+    assert second != first
+    assert manager.get_session_id() == second
+    
+    names = {s["id"]: s["name"] for s in manager.list_sessions()}
+    assert names == {first: "First", second: "Second"}
+
+
+def test_append_and_load(manager, sessions_dir):
+    """Test that appended records are committed and read back in order."""
+    session_id = manager.create_session("Research")
+    manager.add_entity("business", "Acme Corp", {"state": "DE"}, timestamp=100)
+    manager.add_query("acme litigation", "company_research", {"depth": 2}, [{"title": "Result"}], timestamp=101)
+    manager.add_message("user", "What cases involve Acme?", timestamp=102)
+    manager.add_message("assistant", "Two cases were found.", timestamp=103)
+    manager.close()
+    
+    reopened = SessionManager(sessions_dir)
+    try:
+        session = reopened.load_session(session_id)
+        
+        assert session["entities"] == [
+            {"type": "business", "name": "Acme Corp", "timestamp": 100, "metadata": {"state": "DE"}}
+        ]
+        assert session["queries"] == [
+            {"query": "acme litigation", "tool": "company_research", "timestamp": 101,
+             "parameters": {"depth": 2}, "results": [{"title": "Result"}]}
+        ]
+        assert [m["content"] for m in session["messages"]] == [
+            "What cases involve Acme?", "Two cases were found."
+        ]
+        
+        summary = reopened.summarize_session(session_id)
+        assert summary["entity_count"] == 1
+        assert summary["tool_usage"] == {"company_research": 1}
+        assert summary["message_roles"] == {"user": 1, "assistant": 1}
+        
+        with pytest.raises(FileNotFoundError):
+            reopened.load_session("session_missing")
+    finally:
+        reopened.close()
+
+
+def test_flush(manager, sessions_dir):
+    """Test that appends stay uncommitted until flush() runs."""
+    manager.create_session()
+    manager.add_message("user", "first")
+    manager.add_message("user", "second")
+    
+    assert _committed_count(sessions_dir, "messages") == 0
+    
+    manager.flush()
+    
+    assert _committed_count(sessions_dir, "messages") == 2
+
+
+def test_group_commit(sessions_dir):
+    """Test that a full batch or the flush timer commits appends."""
+    manager = SessionManager(sessions_dir, flush_interval_ms=60000, flush_every_n=2)
+    try:
+        manager.create_session()
+        manager.add_entity("person", "Jane Roe")
+        assert _committed_count(sessions_dir, "entities") == 0
+        
+        manager.add_entity("person", "John Doe")
+        assert _committed_count(sessions_dir, "entities") == 2
+    finally:
+        manager.close()
+    
+    manager = SessionManager(sessions_dir, flush_interval_ms=10, flush_every_n=1000)
+    try:
+        manager.create_session()
+        manager.add_entity("person", "Richard Roe")
+        
+        deadline = time.monotonic() + 5
+        while _committed_count(sessions_dir, "entities") < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _committed_count(sessions_dir, "entities") == 3
+    finally:
+        manager.close()
+
+
+def test_list_sessions_order(manager):
+    """Test that sessions are listed in creation order, not by last update."""
+    with patch("src.session_manager.time.time", side_effect=[100, 200]):
+        first = manager.create_session("First")
+        second = manager.create_session("Second")
+    
+    manager.load_session(first)
+    manager.add_message("user", "a later message", timestamp=300)
+    
+    sessions = manager.list_sessions()
+    
+    assert [s["id"] for s in sessions] == [first, second]
+    assert sessions[0]["last_updated"] == 300
+    assert sessions[0]["message_count"] == 1
+
+
+def test_search_sessions(manager):
+    """Test full-text search over entities, queries and messages."""
+    first = manager.create_session("First")
+    manager.add_entity("business", "Acme Corporation")
+    manager.add_query("acme contract disputes", "judgment_research")
+    manager.add_message("assistant", "The court ruled against Acme in the contract dispute.")
+    second = manager.create_session("Second")
+    manager.add_message("user", "Tell me about trademark law.")
+    
+    results = manager.search_sessions("ACME")
+    
+    assert [r["id"] for r in results] == [first]
+    assert results[0]["name"] == "First"
+    assert results[0]["entity_matches"] == ["Acme Corporation"]
+    assert results[0]["query_matches"] == ["acme contract disputes"]
+    assert results[0]["message_matches"][0]["role"] == "assistant"
+    assert "Acme" in results[0]["message_matches"][0]["snippet"]
+    
+    # The last word of the term matches as a prefix
+    assert [r["id"] for r in manager.search_sessions("trade")] == [second]
+    assert manager.search_sessions("patent") == []
+    assert manager.search_sessions("  ") == []
+
+
+def test_delete_session(manager):
+    """Test that deleting a session removes it and its records."""
+    session_id = manager.create_session()
+    manager.add_message("user", "privileged notes")
+    
+    assert manager.delete_session(session_id)
+    
+    assert manager.get_session_id() is None
+    assert manager.list_sessions() == []
+    assert manager.search_sessions("privileged") == []
+    assert not manager.delete_session(session_id)
+
+
+def test_legacy_import(sessions_dir):
+    """Test that sessions saved as JSON files are imported once."""
+    os.makedirs(sessions_dir)
+    sessions = [
+        {"id": "session_200", "name": "Newer", "start_time": 200, "last_updated": 250},
+        {"id": "session_100", "name": "Older", "start_time": 100, "last_updated": 150},
+    ]
+    with open(os.path.join(sessions_dir, "sessions_index.json"), "w", encoding="utf-8") as f:
+        json.dump({"sessions": sessions}, f)
+    for session in sessions:
+        with open(os.path.join(sessions_dir, f"{session['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "id": session["id"],
+                "entities": [{"type": "court", "name": f"{session['name']} Court", "timestamp": session["start_time"]}],
+                "queries": [],
+                "messages": [{"role": "user", "content": f"{session['name']} question", "timestamp": session["last_updated"]}]
+            }, f)
+    
+    manager = SessionManager(sessions_dir)
+    try:
+        # The JSON index order is kept
+        assert [s["id"] for s in manager.list_sessions()] == ["session_200", "session_100"]
+        
+        session = manager.load_session("session_100")
+        assert session["entities"][0]["name"] == "Older Court"
+        assert session["entities"][0]["metadata"] == {}
+        assert session["messages"][0]["content"] == "Older question"
+        
+        assert [r["id"] for r in manager.search_sessions("newer")] == ["session_200"]
+        
+        manager.delete_session("session_200")
+    finally:
+        manager.close()
+    
+    # A deleted session is not imported again
+    manager = SessionManager(sessions_dir)
+    try:
+        assert [s["id"] for s in manager.list_sessions()] == ["session_100"]
+    finally:
+        manager.close()
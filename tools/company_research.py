@@ -16,6 +16,31 @@ from src.processor import DocumentProcessor
 from src.indexer import DocumentIndexer
 from src.langchain_integration import LegalLangChain
 from src.search import LegalSearchEngine
+from src.error_handler import setup_logger
+
+# Set up logging. The src imports above already configured the root logger,
+# so a basicConfig call here would do nothing; the handlers go on this logger.
+logger = setup_logger('CompanyResearch', 'company_research.log')
+logger.propagate = False
+
+def _newest_mtime(directory):
+    """
+    Get the latest modification time of any file in a directory tree.
+    
+    Args:
+        directory: Directory to scan
+        
+    Returns:
+        Latest modification time, or 0 if the directory has no files
+    """
+    newest = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                newest = max(newest, _newest_mtime(entry.path))
+            else:
+                newest = max(newest, entry.stat().st_mtime)
+    return newest
 
 def main():
     """Run the company status research tool."""
@@ -39,8 +64,9 @@ def main():
         os.makedirs(directory, exist_ok=True)
     
     # Step 1: Crawl (if refresh is requested or data doesn't exist)
-    if args.refresh or not os.listdir(data_dir):
-        print(f"\n--- Collecting data for {args.company} ---")
+    crawled = args.refresh or not os.listdir(data_dir)
+    if crawled:
+        logger.info("Collecting data for %s", args.company)
         
         # Load configuration
         config = Config.from_file("configs/enhanced_business_research.json")
@@ -52,32 +78,37 @@ def main():
         if args.state:
             company_query += f" {args.state}"
         
-        print(f"Searching for: {company_query}")
+        logger.info("Searching for: %s", company_query)
         
         # Here we'd ideally modify the crawler to search specifically for the company
         # This would require extending the crawler class to support search queries
         # For now, we'll just crawl the standard sources
         
-        print("Crawling sources for company information...")
+        logger.info("Crawling sources for company information...")
         crawler.crawl(output_dir=data_dir)
-        print(f"Crawling complete. Data saved to {data_dir}")
+        logger.info("Crawling complete. Data saved to %s", data_dir)
     else:
-        print(f"Using existing data in {data_dir}. Use --refresh to update data.")
+        logger.info("Using existing data in %s. Use --refresh to update data.", data_dir)
     
-    # Step 2: Process
-    print("\n--- Processing company data ---")
-    processor = DocumentProcessor()
-    processor.process_directory(data_dir, processed_dir)
-    print(f"Processing complete. Processed data saved to {processed_dir}")
-    
-    # Step 3: Index
-    print("\n--- Indexing company data ---")
-    indexer = DocumentIndexer()
-    indexer.index_directory(processed_dir, index_dir)
-    print(f"Indexing complete. Index saved to {index_dir}")
+    # Steps 2 and 3 only run when the data has changed since it was last indexed
+    index_mtime = _newest_mtime(index_dir)
+    if crawled or not index_mtime or _newest_mtime(data_dir) > index_mtime:
+        # Step 2: Process
+        logger.info("Processing company data")
+        processor = DocumentProcessor()
+        processor.process_directory(data_dir, processed_dir)
+        logger.info("Processing complete. Processed data saved to %s", processed_dir)
+        
+        # Step 3: Index
+        logger.info("Indexing company data")
+        indexer = DocumentIndexer()
+        indexer.index_directory(processed_dir, index_dir)
+        logger.info("Indexing complete. Index saved to %s", index_dir)
+    else:
+        logger.info("Index in %s is up to date. Use --refresh to rebuild it.", index_dir)
     
     # Step 4: Search
-    print(f"\n--- Researching {args.company} ---")
+    logger.info("Researching %s", args.company)
     
     # Basic company status queries
     queries = [
@@ -107,7 +138,7 @@ def main():
             6. Registered agent information
             """
             
-            print("Generating company status report...\n")
+            logger.info("Generating company status report...")
             response = legal_langchain.query(comprehensive_query)
             
             print("Company Status Report:")
@@ -119,16 +150,15 @@ def main():
                 print(f"{i+1}. {source.get('source', 'Unknown')}")
             
         else:
-            print("\nFor more detailed analysis, set your OPENAI_API_KEY in the .env file.")
+            logger.info("For more detailed analysis, set your OPENAI_API_KEY in the .env file.")
             
             # Fallback to basic search
             search_engine = LegalSearchEngine(index_dir)
             
             print("\n=== Basic Company Information ===\n")
             
-            for query in queries:
+            for query, results in zip(queries, search_engine.batch_search(queries, k=2)):
                 print(f"Query: {query}")
-                results = search_engine.search(query, k=2)
                 
                 if results:
                     for i, result in enumerate(results):
@@ -141,10 +171,9 @@ def main():
                 print("\n" + "-" * 50)
     
     except Exception as e:
-        print(f"Error during search: {str(e)}")
+        logger.error("Error during search: %s", e)
     
-    print("\nResearch complete!")
-    print(f"\nAll data is stored in: {os.path.abspath(args.output)}")
+    logger.info("Research complete! All data is stored in: %s", os.path.abspath(args.output))
     print("\nTo conduct more specific searches:")
     print(f"python main.py search --query \"your query about {args.company}\" --index {index_dir}")
 
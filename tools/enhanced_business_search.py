@@ -27,7 +27,7 @@ from src.enhanced_legal_schemas import EnhancedLegalSchemas, LegalSearchPrompts
 
 # Try to import Firecrawl integration
 try:
-    from src.firecrawl_integration import FirecrawlClient
+    from src.firecrawl_integration import get_default_client
     FIRECRAWL_AVAILABLE = True
 except ImportError:
     FIRECRAWL_AVAILABLE = False
@@ -74,7 +74,7 @@ def search_business_entities(args):
 
 def search_with_firecrawl(args, search_term, search_type, location_context, results_dir):
     """Use Firecrawl to extract structured business entity data."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     print("\n--- Using Firecrawl for advanced extraction ---")
     
@@ -304,9 +304,8 @@ def search_with_standard_crawler(args, data_dir, processed_dir, index_dir, resul
     
     print("\n=== Basic Business Entity Information ===\n")
     
-    for query in queries:
+    for query, results in zip(queries, search_engine.batch_search(queries, k=3)):
         print(f"Query: {query}")
-        results = search_engine.search(query, k=3)
         
         if results:
             for i, result in enumerate(results):
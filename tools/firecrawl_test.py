@@ -16,7 +16,7 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 try:
-    from src.firecrawl_integration import FirecrawlClient, LegalSchemas
+    from src.firecrawl_integration import LegalSchemas, get_default_client
     FIRECRAWL_AVAILABLE = True
 except ImportError:
     FIRECRAWL_AVAILABLE = False
@@ -24,7 +24,7 @@ except ImportError:
 
 def scrape_url(args):
     """Scrape a URL using Firecrawl."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     formats = args.formats.split(',')
     
@@ -76,7 +76,7 @@ def scrape_url(args):
 
 def crawl_url(args):
     """Crawl a URL and its subpages using Firecrawl."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     formats = args.formats.split(',')
     
@@ -163,7 +163,7 @@ def crawl_url(args):
 
 def check_status(args):
     """Check the status of a crawl job."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     print(f"Checking status of job: {args.job_id}")
     
@@ -182,7 +182,7 @@ def check_status(args):
 
 def map_website(args):
     """Map a website to get all URLs."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     print(f"Mapping website: {args.url}")
     if args.search:
@@ -209,7 +209,7 @@ def map_website(args):
 
 def search_web(args):
     """Search the web using Firecrawl."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     print(f"Searching for: {args.query}")
     print(f"Limit: {args.limit}")
@@ -247,7 +247,7 @@ def search_web(args):
 
 def extract_data(args):
     """Extract structured data from URLs."""
-    client = FirecrawlClient(api_key=args.api_key)
+    client = get_default_client(args.api_key)
     
     # Parse URLs
     urls = args.urls.split(',')
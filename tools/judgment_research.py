@@ -157,9 +157,8 @@ def main():
             
             print("\n=== Basic Judgment Information ===\n")
             
-            for query in queries:
+            for query, results in zip(queries, search_engine.batch_search(queries, k=2)):
                 print(f"Query: {query}")
-                results = search_engine.search(query, k=2)
                 
                 if results:
                     for i, result in enumerate(results):